@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+import tarfile
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+
+
+class ArtifactStore(ABC):
+    """
+    A store of built layer outputs, keyed by layer's input fingerprint.
+    Lambda layer code consults the store before building and
+    uploads the outputs to the store after a successful build.
+    """
+    ENVIRONMENT_VARIABLE = 'B_CFN_LAMBDA_LAYER_ARTIFACT_STORE'
+
+    @abstractmethod
+    def fetch(self, fingerprint: str, destination_path: str) -> bool:
+        """
+        Restores layer outputs to a given directory.
+
+        :param fingerprint: Layer's input fingerprint.
+        :param destination_path: Directory to extract layer outputs to.
+
+        :return: True if the outputs were found and restored, False otherwise.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def store(self, fingerprint: str, source_path: str) -> None:
+        """
+        Stores layer outputs.
+
+        :param fingerprint: Layer's input fingerprint.
+        :param source_path: Directory containing layer outputs.
+
+        :return: No return.
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def from_uri(uri: str) -> ArtifactStore:
+        """
+        Creates a store from a URI: "s3://bucket/prefix" for an S3 store,
+        or a directory path for a local store.
+
+        :param uri: Store URI.
+
+        :return: Artifact store instance.
+        """
+        if uri.startswith('s3://'):
+            from b_cfn_lambda_layer.s3_artifact_store import S3ArtifactStore
+
+            bucket, _, prefix = uri[len('s3://'):].partition('/')
+            return S3ArtifactStore(bucket=bucket, prefix=prefix, endpoint_url=os.environ.get('AWS_ENDPOINT_URL_S3'))
+
+        from b_cfn_lambda_layer.local_artifact_store import LocalArtifactStore
+
+        return LocalArtifactStore(root_path=uri)
+
+    @classmethod
+    def from_environment(cls) -> Optional[ArtifactStore]:
+        """
+        Creates a store from the B_CFN_LAMBDA_LAYER_ARTIFACT_STORE environment variable.
+        Handy for CI pipelines, as no code changes are needed.
+
+        :return: Artifact store instance or None if the variable is not set.
+        """
+        uri = os.environ.get(cls.ENVIRONMENT_VARIABLE)
+        return cls.from_uri(uri) if uri else None
+
+    @staticmethod
+    def pack(source_path: str, fileobj: BinaryIO) -> None:
+        """
+        Writes a gzipped tar archive of a given directory to a file object.
+        """
+        with tarfile.open(fileobj=fileobj, mode='w|gz') as tar:
+            for name in sorted(os.listdir(source_path)):
+                tar.add(os.path.join(source_path, name), arcname=name)
+
+    @staticmethod
+    def unpack(fileobj: BinaryIO, destination_path: str) -> None:
+        """
+        Extracts a gzipped tar archive from a (non-seekable) stream, member by member.
+        """
+        destination_path = os.path.abspath(destination_path)
+        os.makedirs(destination_path, exist_ok=True)
+
+        with tarfile.open(fileobj=fileobj, mode='r|gz') as tar:
+            for member in tar:
+                target = os.path.abspath(os.path.join(destination_path, member.name))
+
+                if os.path.commonpath([destination_path, target]) != destination_path:
+                    raise ValueError(f'Archive member ({member.name}) is outside of the destination.')
+
+                if member.issym():
+                    link_target = os.path.abspath(os.path.join(os.path.dirname(target), member.linkname))
+                    if os.path.commonpath([destination_path, link_target]) != destination_path:
+                        raise ValueError(f'Archive member ({member.name}) links outside of the destination.')
+                elif not (member.isfile() or member.isdir()):
+                    raise ValueError(f'Archive member ({member.name}) has unsupported type.')
+
+                if hasattr(tarfile, 'data_filter'):
+                    tar.extract(member, destination_path, filter='data')
+                else:
+                    tar.extract(member, destination_path)
@@ -0,0 +1,195 @@
+import logging
+import re
+import time
+from typing import Optional, Callable, Dict
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BuildEvent:
+    class Status:
+        DONE = 'DONE'
+        CACHED = 'CACHED'
+        ERROR = 'ERROR'
+
+    def __init__(
+            self,
+            layer_name: Optional[str],
+            step: str,
+            status: str,
+            duration: float,
+            package: Optional[str] = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param layer_name: Name of the layer that is being built.
+        :param step: Docker build step e.g. "RUN eval $PIP_INSTALL".
+        :param status: Step status (see BuildEvent.Status).
+        :param duration: Step (or package installation) duration in seconds.
+        :param package: Package name, if the event is about a single package
+            installation within the dependencies installation step.
+        """
+        self.layer_name = layer_name
+        self.step = step
+        self.status = status
+        self.duration = duration
+        self.package = package
+
+    def __repr__(self) -> str:
+        package = f' ({self.package})' if self.package else ''
+        return f'[{self.layer_name}] {self.step}{package}: {self.status} in {self.duration:.2f}s'
+
+
+class BuildLogParser:
+    """
+    Parses docker build output line by line into timed build events.
+    Both BuildKit ("plain" progress) and legacy builder outputs are supported.
+    """
+    BUILDKIT_STEP = re.compile(r'^#(\d+) \[[^\]]+\] (.+)$')
+    BUILDKIT_END = re.compile(r'^#(\d+) (DONE ([\d.]+)s|CACHED|ERROR.*)$')
+    BUILDKIT_OUTPUT = re.compile(r'^#(\d+) ([\d.]+) (.*)$')
+    LEGACY_STEP = re.compile(r'^Step \d+/\d+ : (.+)$')
+    LEGACY_CACHED = ' ---> Using cache'
+    # Pip prints "Successfully built <package>" too, hence an image id is expected.
+    LEGACY_END = re.compile(r'^Successfully (built [0-9a-f]{12,}|tagged .+)$')
+    # Pip indents some of its output e.g. "  Building wheel for cffi (setup.py): started".
+    PIP_PACKAGE = re.compile(r'^\s*(?:Collecting|Building wheel for) ([A-Za-z0-9_.\-]+)(?!.*: finished)')
+    PIP_PACKAGE_END = re.compile(
+        r'^\s*(?:Building wheel for .*: finished|Building wheels for collected packages|Installing collected packages)'
+    )
+
+    LEGACY_STEP_ID = 'legacy'
+
+    def __init__(self, layer_name: Optional[str] = None, on_event: Optional[Callable[[BuildEvent], None]] = None) -> None:
+        """
+        Constructor.
+
+        :param layer_name: Name of the layer that is being built. Attached to every event.
+        :param on_event: Callback for build events. If None - events are logged.
+        """
+        self.__layer_name = layer_name
+        self.__on_event = on_event or self.log_event
+
+        # Step id -> (step, start time, cached).
+        self.__steps: Dict[str, list] = {}
+        # Step id -> (package, start time, whether start time is a BuildKit in-step offset).
+        self.__packages: Dict[str, tuple] = {}
+
+    def feed(self, line: str) -> None:
+        line = line.rstrip()
+
+        match = self.BUILDKIT_STEP.match(line)
+        if match:
+            self.__start_step(match.group(1), match.group(2))
+            return
+
+        match = self.BUILDKIT_END.match(line)
+        if match:
+            step_id, status = match.group(1), match.group(2)
+            if status.startswith('DONE'):
+                self.__end_step(step_id, BuildEvent.Status.DONE, float(match.group(3)))
+            elif status == 'CACHED':
+                self.__end_step(step_id, BuildEvent.Status.CACHED)
+            else:
+                self.__end_step(step_id, BuildEvent.Status.ERROR)
+            return
+
+        match = self.BUILDKIT_OUTPUT.match(line)
+        if match:
+            self.__step_output(match.group(1), match.group(3), float(match.group(2)))
+            return
+
+        match = self.LEGACY_STEP.match(line)
+        if match:
+            self.__end_step(self.LEGACY_STEP_ID, BuildEvent.Status.DONE)
+            self.__start_step(self.LEGACY_STEP_ID, match.group(1))
+            return
+
+        if line.startswith(self.LEGACY_CACHED) and self.LEGACY_STEP_ID in self.__steps:
+            self.__steps[self.LEGACY_STEP_ID][2] = True
+            return
+
+        if self.LEGACY_END.match(line):
+            self.__end_step(self.LEGACY_STEP_ID, BuildEvent.Status.DONE)
+            return
+
+        if self.LEGACY_STEP_ID in self.__steps:
+            self.__step_output(self.LEGACY_STEP_ID, line)
+
+    def close(self, failed: bool = False) -> None:
+        """
+        Ends all unfinished steps e.g. when the build output ends.
+
+        :param failed: Whether the build failed.
+
+        :return: No return.
+        """
+        for step_id in list(self.__steps):
+            self.__end_step(step_id, BuildEvent.Status.ERROR if failed else BuildEvent.Status.DONE)
+
+    @staticmethod
+    def log_event(event: BuildEvent) -> None:
+        LOGGER.info(repr(event), extra={'build_event': event})
+
+    def __start_step(self, step_id: str, step: str) -> None:
+        # BuildKit repeats step headers when interleaved outputs switch back to the step.
+        if step_id not in self.__steps:
+            self.__steps[step_id] = [step, time.perf_counter(), False]
+
+    def __end_step(self, step_id: str, status: str, duration: Optional[float] = None) -> None:
+        if step_id not in self.__steps:
+            return
+
+        self.__end_package(step_id, status, duration)
+
+        step, start, cached = self.__steps.pop(step_id)
+
+        if cached and status == BuildEvent.Status.DONE:
+            status = BuildEvent.Status.CACHED
+
+        if duration is None:
+            duration = time.perf_counter() - start
+
+        self.__on_event(BuildEvent(self.__layer_name, step, status, duration))
+
+    def __step_output(self, step_id: str, output: str, offset: Optional[float] = None) -> None:
+        """
+        Handles a single output line of a step.
+
+        :param step_id: Step id.
+        :param output: Output line.
+        :param offset: BuildKit in-step timestamp (seconds since the step started).
+            It is more accurate than the time the line was received, since output is buffered.
+
+        :return: No return.
+        """
+        if step_id not in self.__steps:
+            return
+
+        if self.PIP_PACKAGE_END.match(output):
+            self.__end_package(step_id, BuildEvent.Status.DONE, offset)
+            return
+
+        match = self.PIP_PACKAGE.match(output)
+        if match:
+            self.__end_package(step_id, BuildEvent.Status.DONE, offset)
+
+            if offset is None:
+                self.__packages[step_id] = (match.group(1), time.perf_counter(), False)
+            else:
+                self.__packages[step_id] = (match.group(1), offset, True)
+
+    def __end_package(self, step_id: str, status: str, offset: Optional[float] = None) -> None:
+        if step_id not in self.__packages:
+            return
+
+        package, start, is_offset = self.__packages.pop(step_id)
+        step = self.__steps[step_id][0]
+
+        if is_offset and offset is not None:
+            duration = offset - start
+        else:
+            duration = time.perf_counter() - (self.__steps[step_id][1] + start if is_offset else start)
+
+        self.__on_event(BuildEvent(self.__layer_name, step, status, max(duration, 0.0), package))
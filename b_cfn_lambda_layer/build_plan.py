@@ -0,0 +1,65 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Tuple
+
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BuildPlan:
+    def __init__(self, codes: List[LambdaLayerCode], max_workers: Optional[int] = None) -> None:
+        """
+        Constructor.
+
+        :param codes: Lambda layer codes to build.
+        :param max_workers: Maximum number of parallel docker builds.
+            If None - a default of concurrent.futures.ThreadPoolExecutor is used.
+        """
+        self.__codes = codes
+        self.__max_workers = max_workers
+
+    def execute(self) -> Dict[str, str]:
+        """
+        Builds all given layer codes. Codes with identical inputs are built only once.
+
+        Builds are executed in two parallel waves. The first wave builds one code for
+        every distinct docker image and installation command pair, which warms up
+        the docker layer cache. The second wave builds the rest of the codes (that
+        differ only by source code) and reuses the cached dependency installations.
+        The Dockerfile declares the source code path only after the installation,
+        hence codes with differently named source directories share the cache too.
+
+        :return: A map of code fingerprints to built artifact paths.
+        """
+        # Resolve docker images sequentially, so that the same image is not looked up in parallel.
+        for code in self.__codes:
+            code.build_docker_image()
+
+        distinct: Dict[str, LambdaLayerCode] = {}
+        for code in self.__codes:
+            distinct.setdefault(code.fingerprint(), code)
+
+        LOGGER.info(f'Building {len(distinct)} distinct layer(s) out of {len(self.__codes)} declared.')
+
+        warm_up: Dict[Tuple[str, str], LambdaLayerCode] = {}
+        rest: List[LambdaLayerCode] = []
+
+        for code in sorted(distinct.values(), key=self.__cache_key):
+            if self.__cache_key(code) in warm_up:
+                rest.append(code)
+            else:
+                warm_up[self.__cache_key(code)] = code
+
+        artifacts: Dict[str, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            for wave in [list(warm_up.values()), rest]:
+                for code, artifact in zip(wave, executor.map(LambdaLayerCode.build_artifact, wave)):
+                    artifacts[code.fingerprint()] = artifact
+
+        return artifacts
+
+    @staticmethod
+    def __cache_key(code: LambdaLayerCode) -> Tuple[str, str]:
+        return code.build_docker_image(), code.dependencies_install_command()
@@ -30,3 +30,12 @@ class Dependency:
 
         else:
             raise ValueError('Unsupported enum value.')
+
+    def is_pinned(self) -> bool:
+        """
+        Checks whether the dependency installs the same version every time.
+        Dependencies of the "latest" version are not pinned.
+
+        :return: True if the dependency is pinned.
+        """
+        return self.__version.version_type != PackageVersion.VersionType.LATEST
@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import platform as host_platform
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import List, Tuple, Optional
+
+from b_cfn_lambda_layer.dependency import Dependency
+from b_cfn_lambda_layer.package_version import PackageVersion
+from b_cfn_lambda_layer.tmp import docker_build_root
+
+LOGGER = logging.getLogger(__name__)
+
+
+class DependencyClassifier:
+    """
+    Resolves dependencies, including transitive ones, once for the target python version,
+    and classifies the resolved distributions to the ones that ship wheels for the target
+    platform (and can be installed on any host with "pip install --platform") and the ones
+    that need a Linux build environment (sdist-only distributions, or distributions whose
+    wheels do not support the target platform).
+
+    Both parts are pinned to the resolved versions and must be installed with "--no-deps",
+    so that the host and docker never resolve (possibly different) versions on their own.
+
+    Pip can not resolve source distributions for a foreign platform and evaluates environment
+    markers (e.g. 'python_version < "3.11"') against the interpreter it runs on. Hence the
+    resolution runs only on a Linux host of the target architecture, with an interpreter
+    of the target python version.
+    """
+    DEFAULT_PLATFORM = 'manylinux2014_x86_64'
+
+    # Legacy manylinux platform tags and glibc versions they stand for (PEP 600).
+    LEGACY_MANYLINUX = {
+        'manylinux1': (2, 5),
+        'manylinux2010': (2, 12),
+        'manylinux2014': (2, 17),
+    }
+
+    def __init__(
+            self,
+            python_version: str,
+            platform: Optional[str] = None,
+            additional_pip_install_args: Optional[str] = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param python_version: Target python version e.g. "3.9".
+        :param platform: Target platform tag. Default - manylinux2014_x86_64.
+        :param additional_pip_install_args: A string of additional "pip install" command
+            flags and arguments (e.g. an index URL) used for the resolution.
+        """
+        self.__python_version = python_version
+        self.__platform = platform or self.DEFAULT_PLATFORM
+        self.__additional_pip_install_args = additional_pip_install_args
+
+    def split(self, dependencies: List[Dependency]) -> Tuple[List[Dependency], List[Dependency]]:
+        """
+        Resolves and splits dependencies to the ones installable from wheels and the ones to build.
+
+        Resolution prefers wheels, but falls back to source distributions, hence
+        dependencies (including transitive ones) without wheels are resolved too.
+
+        :param dependencies: Dependencies to resolve.
+
+        :return: A tuple of (dependencies with target platform wheels, dependencies to build),
+            pinned to the resolved versions and covering the whole dependency closure.
+        """
+        wheels, builds = [], []
+
+        for name, version, file_name in self.__resolve(dependencies):
+            dependency = Dependency(name, PackageVersion.from_string_version(version))
+
+            if self.__installable(file_name):
+                wheels.append(dependency)
+            else:
+                builds.append(dependency)
+
+        return wheels, builds
+
+    def __resolve(self, dependencies: List[Dependency]) -> List[Tuple[str, str, str]]:
+        """
+        :return: A list of resolved (name, version, distribution file name) tuples.
+        """
+        requirements = [dependency.build_string() for dependency in dependencies if dependency.build_string()]
+
+        if not requirements:
+            return []
+
+        with tempfile.TemporaryDirectory(dir=docker_build_root) as temporary_path:
+            report_path = os.path.join(temporary_path, 'report.json')
+
+            command = [
+                self.__interpreter(), '-m', 'pip', 'install', *requirements,
+                '--dry-run',
+                '--ignore-installed',
+                '--report', report_path,
+                '--prefer-binary',
+                '--quiet',
+                *shlex.split(self.__additional_pip_install_args or '')
+            ]
+
+            LOGGER.debug(f'Running: {" ".join(command)}.')
+            result = subprocess.run(command, capture_output=True, text=True, check=False)
+
+            if result.returncode != 0:
+                raise RuntimeError(f'Dependencies resolution failed: {result.stdout}\n{result.stderr}')
+
+            with open(report_path) as file:
+                report = json.load(file)
+
+        resolved = []
+        for item in report['install']:
+            file_name = item['download_info']['url'].rsplit('/', 1)[-1]
+            resolved.append((item['metadata']['name'], item['metadata']['version'], file_name))
+
+        return resolved
+
+    def __installable(self, file_name: str) -> bool:
+        """
+        Checks whether a resolved distribution file is a wheel that supports the target platform.
+        Python and ABI tags are not checked, since the resolution ran on a target python version.
+        """
+        if not file_name.endswith('.whl'):
+            return False
+
+        target = self.__manylinux(self.__platform)
+
+        for tag in file_name[:-len('.whl')].split('-')[-1].split('.'):
+            if tag == 'any' or tag == self.__platform:
+                return True
+
+            manylinux = self.__manylinux(tag)
+            if target and manylinux and manylinux[1] == target[1] and manylinux[0] <= target[0]:
+                return True
+
+        return False
+
+    def __manylinux(self, tag: str) -> Optional[Tuple[Tuple[int, int], str]]:
+        """
+        :return: A tuple of (glibc version, architecture) of a manylinux platform tag, if it is one.
+        """
+        match = re.fullmatch(r'manylinux_(\d+)_(\d+)_(\w+)', tag)
+        if match:
+            return (int(match.group(1)), int(match.group(2))), match.group(3)
+
+        legacy, _, architecture = tag.partition('_')
+        if legacy in self.LEGACY_MANYLINUX and architecture:
+            return self.LEGACY_MANYLINUX[legacy], architecture
+
+        return None
+
+    def __interpreter(self) -> str:
+        if not sys.platform.startswith('linux') or not self.__platform.endswith(host_platform.machine()):
+            raise RuntimeError(f'Dependencies for ({self.__platform}) can not be resolved on this host.')
+
+        if f'{sys.version_info.major}.{sys.version_info.minor}' == self.__python_version:
+            return sys.executable
+
+        interpreter = shutil.which(f'python{self.__python_version}')
+        if not interpreter:
+            raise RuntimeError(f'Python ({self.__python_version}) interpreter is not available on this host.')
+
+        return interpreter
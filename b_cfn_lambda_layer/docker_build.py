@@ -0,0 +1,130 @@
+import logging
+import os
+import subprocess
+import tempfile
+from collections import deque
+from typing import Dict, Optional, Callable
+
+LOGGER = logging.getLogger(__name__)
+
+
+class DockerBuild:
+    def __init__(
+            self,
+            context_path: str,
+            dockerfile_path: str,
+            build_args: Optional[Dict[str, str]] = None,
+            image_tag: Optional[str] = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param context_path: Docker build context directory.
+        :param dockerfile_path: Path to a Dockerfile. It may live outside of the build context.
+        :param build_args: Docker build arguments.
+        :param image_tag: Tag of the image to build. If None - the image is not tagged
+            and is removed once outputs are copied out of it.
+        """
+        self.__context_path = context_path
+        self.__dockerfile_path = dockerfile_path
+        self.__build_args = build_args or {}
+        self.__image_tag = image_tag
+
+    def build(
+            self,
+            output_path: str,
+            container_path: str = '/asset',
+            on_output: Optional[Callable[[str], None]] = None
+    ) -> None:
+        """
+        Builds the docker image and copies given container path out of the image.
+        This is what "Code.from_docker_build" does, except that the build is not
+        bound to a jsii kernel and can therefore run in parallel with other builds.
+
+        :param output_path: Directory (must not exist yet) to which outputs are copied.
+        :param container_path: Path within the image to copy.
+        :param on_output: Callback receiving docker build output line by line.
+
+        :return: No return.
+        """
+        options = []
+        for key, value in self.__build_args.items():
+            options.extend(['--build-arg', f'{key}={value}'])
+
+        if self.__image_tag:
+            options.extend(['--tag', self.__image_tag])
+
+        with tempfile.TemporaryDirectory() as temporary_path:
+            # Image id is used instead of a tag, so that concurrent builds never
+            # use each other's images and untagged images do not pile up.
+            image_id_file = os.path.join(temporary_path, 'image_id')
+
+            self.__stream(
+                ['build', '--iidfile', image_id_file, '--file', self.__dockerfile_path, *options, self.__context_path],
+                on_output
+            )
+
+            with open(image_id_file) as file:
+                image_id = file.read().strip()
+
+        try:
+            container_id = self.__docker('create', image_id, capture_output=True).strip()
+
+            try:
+                self.__docker('cp', f'{container_id}:{container_path}', output_path)
+            finally:
+                self.__docker('rm', '--volumes', container_id, capture_output=True)
+        finally:
+            if not self.__image_tag:
+                self.__remove_image(image_id)
+
+    @staticmethod
+    def __stream(args: list, on_output: Optional[Callable[[str], None]] = None) -> None:
+        LOGGER.debug(f'Running: docker {" ".join(args)}.')
+
+        # Plain BuildKit progress is printed line by line, instead of redrawing the terminal.
+        environment = {**os.environ, 'BUILDKIT_PROGRESS': 'plain'}
+
+        # Last lines of output are kept for the error message.
+        tail = deque(maxlen=50)
+
+        with subprocess.Popen(
+                ['docker', *args],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                env=environment
+        ) as process:
+            for line in process.stdout:
+                line = line.rstrip('\n')
+                tail.append(line)
+                LOGGER.debug(line)
+
+                if on_output:
+                    on_output(line)
+
+        if process.returncode != 0:
+            output = '\n'.join(tail)
+            raise RuntimeError(f'Docker command ({args[0]}) failed with exit code {process.returncode}:\n{output}')
+
+    @classmethod
+    def __remove_image(cls, image_id: str) -> None:
+        try:
+            # Parent images are kept, as they are the legacy builder's cache.
+            # BuildKit cache does not depend on images at all.
+            cls.__docker('rmi', '--no-prune', image_id, capture_output=True)
+        except RuntimeError as ex:
+            # E.g. an identical image is being used by another build right now.
+            LOGGER.debug(f'Failed to remove image ({image_id}): {repr(ex)}.')
+
+    @staticmethod
+    def __docker(*args: str, capture_output: bool = False) -> str:
+        LOGGER.debug(f'Running: docker {" ".join(args)}.')
+
+        result = subprocess.run(['docker', *args], capture_output=capture_output, text=True, check=False)
+
+        if result.returncode != 0:
+            raise RuntimeError(f'Docker command ({args[0]}) failed with exit code {result.returncode}: {result.stderr}')
+
+        return result.stdout or ''
@@ -0,0 +1,229 @@
+import json
+import logging
+import os
+import re
+import subprocess
+import uuid
+from typing import Dict, Optional, List, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from b_cfn_lambda_layer.file_lock import FileLock
+from b_cfn_lambda_layer.tmp import docker_build_root
+
+LOGGER = logging.getLogger(__name__)
+
+
+class DockerImageResolver:
+    """
+    Resolves floating docker image tags (e.g. "python:3.9") to immutable
+    digest references (e.g. "python@sha256:...").
+
+    Digests are looked up in the registry, without pulling images: a layer
+    that is already built (or can be restored from an artifact store) never
+    needs its image, and runners without docker resolve the same digests.
+    Images are pulled by docker only when a layer is actually built.
+
+    Resolutions are made once per process (i.e. once per synth) and are
+    persisted on disk, so that subsequent synths reuse the same pinned image
+    and do not hit the registry while that image is still present locally.
+    """
+    DIGEST_SEPARATOR = '@sha256:'
+    CACHE_FILE = f'{docker_build_root}/.docker_image_digests.json'
+
+    DEFAULT_REGISTRY = 'registry-1.docker.io'
+    REGISTRY_TIMEOUT = 10
+    # Multi-platform indexes are accepted first, so that the digest is the one docker pins on pull.
+    MANIFEST_MEDIA_TYPES = (
+        'application/vnd.oci.image.index.v1+json',
+        'application/vnd.docker.distribution.manifest.list.v2+json',
+        'application/vnd.oci.image.manifest.v1+json',
+        'application/vnd.docker.distribution.manifest.v2+json',
+    )
+
+    # Image tag -> digest reference resolutions made within this process.
+    __resolved: Dict[str, str] = {}
+
+    @classmethod
+    def resolve(cls, image: str) -> str:
+        """
+        Resolves a given docker image to a digest reference.
+
+        If a previously pinned digest is still available locally, it is used
+        without contacting the registry. Otherwise, the digest is looked up in
+        the registry (with docker credentials, if docker is available) and pinned.
+        If the registry can not be reached, a digest of a local image is used.
+        If the image can not be resolved at all, it is returned as is.
+
+        :param image: Docker image reference e.g. "python:3.9".
+
+        :return: Digest reference e.g. "python@sha256:...".
+        """
+        if cls.DIGEST_SEPARATOR in image:
+            return image
+
+        if image in cls.__resolved:
+            return cls.__resolved[image]
+
+        digest = cls.__load_cache().get(image)
+
+        if not digest or not cls.__exists_locally(digest):
+            LOGGER.info(f'Resolving docker image ({image}) to a digest.')
+            digest = cls.__registry_digest(image) or cls.__local_digest(image)
+
+            if digest:
+                cls.__save_cache(image, digest)
+
+        if not digest:
+            LOGGER.warning(f'Docker image ({image}) could not be resolved to a digest. Using floating tag.')
+            digest = image
+
+        cls.__resolved[image] = digest
+        return digest
+
+    @classmethod
+    def __registry_digest(cls, image: str) -> Optional[str]:
+        digest = cls.__imagetools_digest(image) or cls.__http_digest(image)
+
+        if not digest:
+            return None
+
+        return f'{cls.__repository(image)}@{digest}'
+
+    @classmethod
+    def __imagetools_digest(cls, image: str) -> Optional[str]:
+        """
+        Looks up a manifest digest with docker, which knows registry credentials.
+        """
+        output = cls.__docker('buildx', 'imagetools', 'inspect', '--format', '{{json .Manifest}}', image)
+
+        try:
+            return json.loads(output)['digest'] if output else None
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def __http_digest(cls, image: str) -> Optional[str]:
+        """
+        Looks up a manifest digest with the registry HTTP API and an anonymous token,
+        hence public images are resolved even without docker.
+        """
+        registry, repository, tag = cls.__reference(image)
+        url = f'https://{registry}/v2/{repository}/manifests/{tag}'
+        headers = {'Accept': ', '.join(cls.MANIFEST_MEDIA_TYPES)}
+
+        try:
+            try:
+                response = urlopen(Request(url, headers=headers, method='HEAD'), timeout=cls.REGISTRY_TIMEOUT)
+            except HTTPError as ex:
+                if ex.code != 401:
+                    raise
+
+                headers['Authorization'] = f'Bearer {cls.__token(ex.headers.get("WWW-Authenticate", ""))}'
+                response = urlopen(Request(url, headers=headers, method='HEAD'), timeout=cls.REGISTRY_TIMEOUT)
+
+            with response:
+                return response.headers.get('Docker-Content-Digest')
+        except (OSError, ValueError, KeyError) as ex:
+            LOGGER.warning(f'Docker image ({image}) could not be looked up in the registry: {repr(ex)}.')
+            return None
+
+    @classmethod
+    def __token(cls, challenge: str) -> str:
+        """
+        Gets an anonymous pull token for a "Bearer realm=...,service=...,scope=..." challenge.
+        """
+        params = dict(re.findall(r'(\w+)="([^"]*)"', challenge))
+        realm = params.pop('realm')
+
+        with urlopen(f'{realm}?{urlencode(params)}', timeout=cls.REGISTRY_TIMEOUT) as response:
+            body = json.load(response)
+
+        return body.get('token') or body['access_token']
+
+    @classmethod
+    def __local_digest(cls, image: str) -> Optional[str]:
+        output = cls.__docker('image', 'inspect', '--format', '{{json .RepoDigests}}', image)
+
+        if not output:
+            return None
+
+        digests: List[str] = json.loads(output) or []
+
+        # Prefer a digest from the same repository as the given image.
+        repository = cls.__repository(image)
+        for digest in digests:
+            if digest.split('@')[0] == repository:
+                return digest
+
+        return digests[0] if digests else None
+
+    @classmethod
+    def __exists_locally(cls, image: str) -> bool:
+        return cls.__docker('image', 'inspect', '--format', '{{.Id}}', image) is not None
+
+    @classmethod
+    def __reference(cls, image: str) -> Tuple[str, str, str]:
+        """
+        :return: A tuple of (registry host, repository path, tag) of an image reference.
+        """
+        repository = cls.__repository(image)
+        tag = image[len(repository) + 1:] or 'latest'
+
+        registry, _, path = repository.partition('/')
+        if not path or ('.' not in registry and ':' not in registry and registry != 'localhost'):
+            # A Docker Hub image e.g. "python" or "library/python".
+            registry, path = cls.DEFAULT_REGISTRY, repository
+
+        if registry == 'docker.io':
+            registry = cls.DEFAULT_REGISTRY
+
+        if registry == cls.DEFAULT_REGISTRY and '/' not in path:
+            path = f'library/{path}'
+
+        return registry, path, tag
+
+    @staticmethod
+    def __repository(image: str) -> str:
+        # The tag is after the last colon, unless that colon belongs to a registry port.
+        repository, _, tag = image.rpartition(':')
+        if not repository or '/' in tag:
+            return image
+
+        return repository
+
+    @staticmethod
+    def __docker(*args: str) -> Optional[str]:
+        try:
+            result = subprocess.run(['docker', *args], capture_output=True, text=True, check=False)
+        except OSError as ex:
+            LOGGER.warning(f'Docker is not available: {repr(ex)}.')
+            return None
+
+        if result.returncode != 0:
+            return None
+
+        return result.stdout.strip()
+
+    @classmethod
+    def __load_cache(cls) -> Dict[str, str]:
+        try:
+            with open(cls.CACHE_FILE) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    @classmethod
+    def __save_cache(cls, image: str, digest: str) -> None:
+        # Other processes may update the cache concurrently.
+        with FileLock(f'{cls.CACHE_FILE}.lock'):
+            cache = cls.__load_cache()
+            cache[image] = digest
+
+            # Write to a temporary file and replace so readers never see a partial file.
+            temporary_file = f'{cls.CACHE_FILE}.{uuid.uuid4().hex}.tmp'
+            with open(temporary_file, 'w') as file:
+                json.dump(cache, file, indent=4, sort_keys=True)
+
+            os.replace(temporary_file, cls.CACHE_FILE)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+from b_cfn_lambda_layer.file_lock import FileLock
+from b_cfn_lambda_layer.tmp import docker_build_root
+
+
+class FileDigestCache:
+    """
+    Caches file content digests by file path, modification time and size,
+    so that unchanged source files are not read and hashed over and over again.
+    The cache is persisted on disk, hence it also speeds up subsequent synths.
+    """
+    CACHE_FILE = f'{docker_build_root}/.file_digests.json'
+
+    # File path -> [modification time in nanoseconds, size, hex digest].
+    __digests: Optional[Dict[str, List]] = None
+    __dirty = False
+    __lock = threading.Lock()
+
+    @classmethod
+    def digest(cls, path: str) -> str:
+        """
+        Calculates (or returns a cached) sha256 digest of the file's contents.
+
+        :param path: Path to a file.
+
+        :return: Hex digest.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with cls.__lock:
+            entry = cls.__load().get(path)
+
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+
+        with open(path, 'rb') as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+
+        with cls.__lock:
+            cls.__load()[path] = [stat.st_mtime_ns, stat.st_size, digest]
+            cls.__dirty = True
+
+        return digest
+
+    @classmethod
+    def save(cls) -> None:
+        """
+        Persists the cache on disk, if it has changed. Entries saved by other processes
+        in the meantime are merged in. Entries of deleted files are dropped.
+
+        :return: No return.
+        """
+        with cls.__lock:
+            if not cls.__dirty:
+                return
+
+            with FileLock(f'{cls.CACHE_FILE}.lock'):
+                digests = {**cls.__read(), **cls.__load()}
+                digests = {path: entry for path, entry in digests.items() if os.path.isfile(path)}
+
+                # Write to a temporary file and replace so readers never see a partial file.
+                temporary_file = f'{cls.CACHE_FILE}.{uuid.uuid4().hex}.tmp'
+                with open(temporary_file, 'w') as file:
+                    json.dump(digests, file)
+
+                os.replace(temporary_file, cls.CACHE_FILE)
+
+            cls.__digests = digests
+            cls.__dirty = False
+
+    @classmethod
+    def __load(cls) -> Dict[str, List]:
+        if cls.__digests is None:
+            cls.__digests = cls.__read()
+
+        return cls.__digests
+
+    @classmethod
+    def __read(cls) -> Dict[str, List]:
+        try:
+            with open(cls.CACHE_FILE) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
@@ -0,0 +1,57 @@
+import os
+import time
+from typing import Optional, IO
+
+try:
+    import fcntl
+except ImportError:
+    # Windows.
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    An exclusive inter-process (and inter-thread) lock backed by a lock file.
+    Lock files are not deleted on release, as deleting them would race with other lockers.
+    Delete a lock file only when what it guards can no longer change.
+
+    Usage:
+    >>> with FileLock('/path/to/entry.lock'):
+    >>>     ...
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Constructor.
+
+        :param path: Path to the lock file. Created if it does not exist.
+        """
+        self.__path = path
+        self.__file: Optional[IO] = None
+
+    def __enter__(self) -> 'FileLock':
+        os.makedirs(os.path.dirname(self.__path) or '.', exist_ok=True)
+        self.__file = open(self.__path, 'a+')
+
+        if fcntl:
+            fcntl.flock(self.__file.fileno(), fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(self.__file.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        try:
+            if fcntl:
+                fcntl.flock(self.__file.fileno(), fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(self.__file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.__file.close()
+            self.__file = None
@@ -0,0 +1,124 @@
+import fnmatch
+import logging
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+from typing import List, Optional
+
+from b_cfn_lambda_layer.dependency import Dependency
+from b_cfn_lambda_layer.dependency_classifier import DependencyClassifier
+
+LOGGER = logging.getLogger(__name__)
+
+
+class HostBuild:
+    """
+    Builds (parts of) a layer directly on the host, without docker.
+    Mirrors what the Dockerfile does: installs dependencies, copies source code and cleans up.
+    """
+
+    def __init__(
+            self,
+            python_version: str,
+            dependencies: Optional[List[Dependency]] = None,
+            additional_pip_install_args: Optional[str] = None,
+            platform: Optional[str] = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param python_version: Target python version e.g. "3.9".
+        :param dependencies: Resolved and pinned dependencies with target platform wheels to install.
+        :param additional_pip_install_args: A string of additional "pip install" command flags and arguments.
+        :param platform: Target platform tag. Default - manylinux2014_x86_64.
+        """
+        self.__python_version = python_version
+        self.__dependencies = [dependency for dependency in dependencies or [] if dependency.build_string()]
+        self.__additional_pip_install_args = additional_pip_install_args
+        self.__platform = platform or DependencyClassifier.DEFAULT_PLATFORM
+
+    def install_dependencies(self, output_path: str) -> None:
+        """
+        Installs dependencies to a given directory. Dependencies must already be resolved
+        and pinned (see DependencyClassifier), hence transitive dependencies are not installed.
+
+        :param output_path: Directory to install dependencies to.
+
+        :return: No return.
+        """
+        if not self.__dependencies:
+            os.makedirs(output_path, exist_ok=True)
+            return
+
+        command = [
+            sys.executable, '-m', 'pip', 'install',
+            *[dependency.build_string() for dependency in self.__dependencies],
+            '--target', output_path,
+            '--only-binary=:all:',
+            '--platform', self.__platform,
+            '--python-version', self.__python_version,
+            '--implementation', 'cp',
+            '--no-deps',
+            '--no-compile',
+            *shlex.split(self.__additional_pip_install_args or '')
+        ]
+
+        LOGGER.debug(f'Running: {" ".join(command)}.')
+        result = subprocess.run(command, capture_output=True, text=True, check=False)
+
+        if result.returncode != 0:
+            raise RuntimeError(f'Host dependencies installation failed: {result.stdout}\n{result.stderr}')
+
+    @staticmethod
+    def copy_source(source_path: str, output_path: str) -> None:
+        """
+        Copies source code, keeping the parent directory (same as the Dockerfile does).
+
+        :param source_path: Path to source code.
+        :param output_path: Layer's "python" directory.
+
+        :return: No return.
+        """
+        shutil.copytree(
+            src=source_path,
+            dst=os.path.join(output_path, os.path.basename(source_path)),
+            dirs_exist_ok=True
+        )
+
+    @staticmethod
+    def merge(source_path: str, output_path: str) -> None:
+        """
+        Merges one layer directory into another. Both directories are expected to contain
+        distinct distributions, hence only shared directories (e.g. namespace packages) overlap.
+        Files that already exist in the output directory are kept i.e. they take precedence.
+
+        :param source_path: Directory to merge.
+        :param output_path: Directory to merge into.
+
+        :return: No return.
+        """
+        def copy_missing(src: str, dst: str) -> None:
+            if not os.path.exists(dst):
+                shutil.copy2(src, dst)
+
+        shutil.copytree(source_path, output_path, copy_function=copy_missing, dirs_exist_ok=True)
+
+    @staticmethod
+    def cleanup(output_path: str) -> None:
+        """
+        Deletes compiled python files and egg-info directories.
+
+        :param output_path: Layer's "python" directory.
+
+        :return: No return.
+        """
+        for directory, dir_names, file_names in os.walk(output_path, topdown=True):
+            for dir_name in list(dir_names):
+                if dir_name == '__pycache__' or dir_name.endswith('.egg-info'):
+                    shutil.rmtree(os.path.join(directory, dir_name))
+                    dir_names.remove(dir_name)
+
+            for file_name in fnmatch.filter(file_names, '*.py[co]'):
+                os.remove(os.path.join(directory, file_name))
@@ -1,15 +1,22 @@
+from __future__ import annotations
+
 import logging
+import os
 from functools import lru_cache
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Callable, Tuple, TYPE_CHECKING
 
 from aws_cdk import Stack, DockerImage
 from aws_cdk.aws_lambda import LayerVersion, Runtime, ILayerVersion, Function
-from aws_cdk.aws_ssm import StringParameter
 
 from b_cfn_lambda_layer.dependency import Dependency
 from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
 from b_cfn_lambda_layer.package_version import PackageVersion
 
+if TYPE_CHECKING:
+    from aws_cdk.aws_ssm import StringParameter
+    from b_cfn_lambda_layer.artifact_store import ArtifactStore
+    from b_cfn_lambda_layer.build_log import BuildEvent
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -23,6 +30,11 @@ class LambdaLayer(LayerVersion):
             dependencies: Optional[Dict[str, PackageVersion]] = None,
             additional_pip_install_args: Optional[str] = None,
             docker_image: Optional[str] = None,
+            pin_docker_image: bool = True,
+            artifact_store: Optional[ArtifactStore] = None,
+            on_build_event: Optional[Callable[[BuildEvent], None]] = None,
+            install_pure_python_on_host: bool = False,
+            lazy_ssm_parameter: bool = False,
             # Better backwards compatibility.
             *args,
             **kwargs
@@ -39,6 +51,15 @@ class LambdaLayer(LayerVersion):
             Values are dependency (package) version objects.
         :param additional_pip_install_args: A string of additional pip-install arguments.
         :param docker_image: Docker image to use when building code.
+        :param pin_docker_image: Resolve docker image to an immutable digest before building.
+        :param artifact_store: A store of built layer outputs to consult before building.
+        :param on_build_event: Callback receiving timed docker build steps. If None - build events are logged.
+        :param install_pure_python_on_host: Install dependencies that ship target platform wheels
+            on the host and build only dependencies that need a build environment with docker.
+        :param lazy_ssm_parameter: Create the "<name>Arn" SSM parameter only when the layer
+            is shared i.e. on the first "copy" or "add_to_function" call. This saves constructs
+            and synth time for layers that are used directly, but such layers do not publish
+            the parameter at all. Default - False, the parameter is always created.
         """
         self.__scope = scope
         self.__name = name
@@ -47,23 +68,26 @@ class LambdaLayer(LayerVersion):
         if isinstance(docker_image, DockerImage):
             docker_image = docker_image.image
 
+        self.__code = LambdaLayerCode(
+            source_path=source_path,
+            additional_pip_install_args=additional_pip_install_args,
+            dependencies=[Dependency(key, value) for key, value in (dependencies or {}).items()],
+            docker_image=docker_image,
+            pin_docker_image=pin_docker_image,
+            artifact_store=artifact_store,
+            name=self.__name,
+            on_build_event=on_build_event,
+            install_pure_python_on_host=install_pure_python_on_host
+        )
+
+        self.__code_runtimes = code_runtimes or self.default_runtimes()
+
         super().__init__(
             scope=self.__scope,
             id=self.__name,
             layer_version_name=self.__name,
-            code=LambdaLayerCode(
-                source_path=source_path,
-                additional_pip_install_args=additional_pip_install_args,
-                dependencies=[Dependency(key, value) for key, value in (dependencies or {}).items()],
-                docker_image=docker_image
-            ).build(),
-            compatible_runtimes=code_runtimes or [
-                Runtime.PYTHON_3_6,
-                Runtime.PYTHON_3_7,
-                Runtime.PYTHON_3_8,
-                Runtime.PYTHON_3_9,
-                Runtime.PYTHON_3_10
-            ]
+            code=self.__code.build(),
+            compatible_runtimes=self.__code_runtimes
         )
 
         for argument in args:
@@ -72,12 +96,25 @@ class LambdaLayer(LayerVersion):
         for name, argument in kwargs.items():
             LOGGER.warning(f'Named argument: ({name}:{argument}) is not supported!')
 
-        self.__ssm_arn = StringParameter(
-            scope=scope,
-            id=f'{self.__name}Arn',
-            parameter_name=f'{self.__name}Arn',
-            string_value=self.layer_version_arn
-        )
+        # SSM parameter is only needed for cross-stack sharing,
+        # hence it can be created lazily, on the first "copy" or "add_to_function" call.
+        self.__ssm_arn: Optional[StringParameter] = None
+
+        if not lazy_ssm_parameter:
+            self.__ssm_parameter()
+
+        # Slimmed layers, keyed by (stack path, slimmed layer path).
+        self.__slimmed_layers: Dict[Tuple[str, str], LayerVersion] = {}
+
+    @staticmethod
+    def default_runtimes() -> List[Runtime]:
+        return [
+            Runtime.PYTHON_3_6,
+            Runtime.PYTHON_3_7,
+            Runtime.PYTHON_3_8,
+            Runtime.PYTHON_3_9,
+            Runtime.PYTHON_3_10
+        ]
 
     @lru_cache(maxsize=None)
     def copy(self, scope: Stack) -> ILayerVersion:
@@ -89,6 +126,11 @@ class LambdaLayer(LayerVersion):
             that the scope should be the same as the resource's that is using the layer copy.
         :return: An indirect copy of this layer's instance.
         """
+        from aws_cdk.aws_ssm import StringParameter
+
+        # Ensure the parameter that is referenced below exists.
+        self.__ssm_parameter()
+
         return LayerVersion.from_layer_version_arn(
             scope=scope,
             id=f'{self.__name}Resolved',
@@ -115,8 +157,68 @@ class LambdaLayer(LayerVersion):
         for function in functions:
             # Add a dependency to the SSM parameter which has a dependency to the layer.
             # This creates an indirect dependency between the function and the layer.
-            function.node.add_dependency(self.__ssm_arn)
+            function.node.add_dependency(self.__ssm_parameter())
             # Create the layer copy withing the same stack as the function.
             # I am not exactly sure why, but this makes everything to magically work.
             layer = self.copy(function.stack)
             function.add_layers(layer)
+
+    def add_slimmed_to_function(
+            self,
+            function: Function,
+            handler_path: str,
+            extra_modules: Optional[List[str]] = None
+    ) -> ILayerVersion:
+        """
+        Adds a slimmed copy of this layer to a given lambda function. The slimmed copy
+        contains only the packages that are reachable (statically, through imports)
+        from the function's handler code. Functions with the same set of reachable
+        packages share the same slimmed layer.
+
+        The slimmed layer is created within the function's stack, hence, like
+        "add_to_function", this method does not create cross-stack dependencies.
+
+        :param function: Lambda function to which the slimmed layer should be added.
+        :param handler_path: Path to the function's handler file or code directory.
+        :param extra_modules: Top-level modules to keep regardless of the analysis
+            e.g. modules that are imported dynamically.
+
+        :return: Slimmed layer.
+        """
+        from aws_cdk.aws_lambda import Code
+        from b_cfn_lambda_layer.layer_slimmer import LayerSlimmer
+
+        slimmer = LayerSlimmer(self.__code.build_artifact())
+        slimmed_path = slimmer.slim(
+            entries=slimmer.reachable(handler_path, extra_modules),
+            output_root=LambdaLayerCode.ARTIFACTS_ROOT
+        )
+
+        key = (function.stack.node.path, slimmed_path)
+
+        if key not in self.__slimmed_layers:
+            self.__slimmed_layers[key] = LayerVersion(
+                scope=function.stack,
+                id=f'{self.__name}Slim{os.path.basename(slimmed_path)[:8]}',
+                code=Code.from_asset(slimmed_path),
+                compatible_runtimes=self.__code_runtimes
+            )
+
+        layer = self.__slimmed_layers[key]
+        function.add_layers(layer)
+
+        return layer
+
+    def __ssm_parameter(self) -> StringParameter:
+        if self.__ssm_arn is None:
+            # Importing SSM module is deferred, as it is not needed for lazily created parameters.
+            from aws_cdk.aws_ssm import StringParameter
+
+            self.__ssm_arn = StringParameter(
+                scope=self.__scope,
+                id=f'{self.__name}Arn',
+                parameter_name=f'{self.__name}Arn',
+                string_value=self.layer_version_arn
+            )
+
+        return self.__ssm_arn
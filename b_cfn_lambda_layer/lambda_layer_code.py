@@ -1,24 +1,56 @@
+import hashlib
+import logging
 import os
+import re
 import shutil
-from typing import Optional, List
-
-from aws_cdk.aws_lambda import Code
+import tempfile
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Callable, TYPE_CHECKING
 
 from b_cfn_lambda_layer import root
+from b_cfn_lambda_layer.artifact_store import ArtifactStore
+from b_cfn_lambda_layer.build_log import BuildLogParser, BuildEvent
 from b_cfn_lambda_layer.dependency import Dependency
+from b_cfn_lambda_layer.dependency_classifier import DependencyClassifier
+from b_cfn_lambda_layer.docker_build import DockerBuild
+from b_cfn_lambda_layer.docker_image_resolver import DockerImageResolver
+from b_cfn_lambda_layer.file_digest_cache import FileDigestCache
+from b_cfn_lambda_layer.file_lock import FileLock
+from b_cfn_lambda_layer.host_build import HostBuild
 from b_cfn_lambda_layer.pip_install import PipInstall
 from b_cfn_lambda_layer.tmp import docker_build_root
 
+if TYPE_CHECKING:
+    from aws_cdk.aws_lambda import Code
+
+LOGGER = logging.getLogger(__name__)
+
 
 class LambdaLayerCode:
     DEFAULT_DOCKER_IMAGE = 'python:3.9'
 
+    # Built layer outputs, stored under their input fingerprint.
+    ARTIFACTS_ROOT = f'{docker_build_root}/.artifacts'
+
+    # Per-fingerprint locks, so that identical layers are built only once within a process.
+    # Across processes (e.g. parallel synths on the same host), file locks are used.
+    __build_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+    __build_locks_guard = threading.Lock()
+
     def __init__(
             self,
             source_path: Optional[str] = None,
             additional_pip_install_args: Optional[str] = None,
             dependencies: Optional[List[Dependency]] = None,
-            docker_image: Optional[str] = None
+            docker_image: Optional[str] = None,
+            pin_docker_image: bool = True,
+            artifact_store: Optional[ArtifactStore] = None,
+            name: Optional[str] = None,
+            on_build_event: Optional[Callable[[BuildEvent], None]] = None,
+            install_pure_python_on_host: bool = False
     ) -> None:
         """
         Constructor.
@@ -29,6 +61,18 @@ class LambdaLayerCode:
             include while installing python dependencies.
         :param dependencies: A list of dependency objects to be installed in the lambda layer.
         :param docker_image: A docker image to be used to build lambda layer.
+        :param pin_docker_image: Resolve the docker image to an immutable digest
+            before building, so that a floating tag (e.g. "python:3.9") can not
+            silently change the build results.
+        :param artifact_store: A store of built layer outputs to consult before building.
+            If None - a store from B_CFN_LAMBDA_LAYER_ARTIFACT_STORE environment variable is used, if set.
+        :param name: Name of the layer. Used to identify build events.
+        :param on_build_event: Callback receiving timed docker build steps (see BuildEvent).
+            If None - build events are logged.
+        :param install_pure_python_on_host: Install dependencies that ship target platform
+            wheels (universal or manylinux ones) directly on the host, in parallel with a docker
+            build of the rest. If no dependency needs building, docker is not used at all.
+            Requires a docker image with a recognizable python version e.g. "python:3.9".
         """
         self.additional_pip_install_args = additional_pip_install_args
         self.dependencies = dependencies
@@ -36,53 +80,314 @@ class LambdaLayerCode:
         self.source_path = source_path or f'{root}/dockerignore'
         self.source_path_dir_name = os.path.basename(self.source_path)
         self.docker_image = docker_image or self.DEFAULT_DOCKER_IMAGE
+        self.pin_docker_image = pin_docker_image
+        self.artifact_store = artifact_store or ArtifactStore.from_environment()
+        self.name = name
+        self.on_build_event = on_build_event
+        self.install_pure_python_on_host = install_pure_python_on_host
 
         # General docker outputs path.
         # According to documentation, all of the python code and python dependencies shall live in "python" dir:
         # https://docs.aws.amazon.com/lambda/latest/dg/configuration-layers.html
         self.outputs_path = '/asset/python'
 
-    def build(self) -> Code:
-        # Before building, ensure source code is available for Dockerfile.
-        self.__fresh_source_copy()
+        self.__fingerprint: Optional[str] = None
 
-        # Now, after the source code was made available. Build the code with Docker.
-        return Code.from_docker_build(
-            path=root,
-            build_args={
-                # Custom docker image.
-                'DOCKER_IMAGE': self.docker_image,
+    def build(self) -> 'Code':
+        # CDK is imported lazily, so that layers can be built without loading the jsii runtime.
+        from aws_cdk.aws_lambda import Code
 
-                # OS-level paths.
-                'INPUTS_PATH': f'./tmp/{self.source_path_dir_name}',
+        return Code.from_asset(self.build_artifact())
 
-                # Docker container-level paths.
-                'OUTPUTS_PATH': self.outputs_path,
+    def build_artifact(self) -> str:
+        """
+        Builds the layer's contents with Docker, unless a layer with identical
+        inputs has already been built locally or can be restored from the artifact store.
 
-                # Prebuilt commands to install.
-                'PIP_INSTALL': self.__dependencies_install_command(),
-            },
-        )
+        :return: Path to a directory containing built layer's contents.
+        """
+        fingerprint = self.fingerprint()
+        artifact_path = f'{self.ARTIFACTS_ROOT}/{fingerprint}'
+
+        with self.__build_locks_guard:
+            build_lock = self.__build_locks[fingerprint]
+
+        # Fast path, without locking, if the artifact was already published.
+        if os.path.isdir(artifact_path):
+            return artifact_path
+
+        lock_path = f'{artifact_path}.lock'
+
+        with build_lock, FileLock(lock_path):
+            # Someone else might have built it while we were waiting for the lock.
+            if os.path.isdir(artifact_path):
+                self.__remove_lock_file(lock_path)
+                return artifact_path
+
+            # Build (or restore) into a unique temporary directory and publish it
+            # with an atomic rename, only when it succeeds.
+            temporary_path = f'{artifact_path}.{uuid.uuid4().hex}.tmp'
+
+            try:
+                if self.__fetch(fingerprint, temporary_path):
+                    os.replace(temporary_path, artifact_path)
+                    self.__remove_lock_file(lock_path)
+                    return artifact_path
+
+                self.__build(fingerprint, temporary_path)
+                os.replace(temporary_path, artifact_path)
+            finally:
+                shutil.rmtree(temporary_path, ignore_errors=True)
+
+            self.__store(fingerprint, artifact_path)
+            self.__remove_lock_file(lock_path)
+
+        return artifact_path
+
+    @staticmethod
+    def __remove_lock_file(lock_path: str) -> None:
+        """
+        Once the artifact is published, the lock is no longer needed: everyone, including
+        processes still waiting for (an already deleted) lock file, finds the artifact first.
+        """
+        try:
+            os.remove(lock_path)
+        except OSError:
+            # E.g. already removed, or locked files can not be removed (Windows).
+            pass
 
-    def __dependencies_install_command(self) -> str:
+    @property
+    def python_version(self) -> Optional[str]:
+        """
+        Python version of the docker image e.g. "3.9" for "python:3.9-slim".
+
+        :return: Python version or None if it can not be determined from the image name.
+        """
+        match = re.match(r'^(?:.*/)?python:(\d+\.\d+)', self.docker_image)
+        return match.group(1) if match else None
+
+    def fingerprint(self) -> str:
+        """
+        Calculates a hash of all the inputs that affect the built layer:
+        the Dockerfile, the (pinned) docker image, the installation command
+        and the source code.
+
+        :return: Hex digest.
+        """
+        if self.__fingerprint:
+            return self.__fingerprint
+
+        sha = hashlib.sha256()
+
+        with open(f'{root}/Dockerfile', 'rb') as file:
+            sha.update(file.read())
+
+        for key, value in sorted(self.__build_args().items()):
+            sha.update(f'{key}={value}\n'.encode())
+
+        sha.update(self.__source_hash().encode())
+        FileDigestCache.save()
+
+        if self.install_pure_python_on_host:
+            sha.update(b'install_pure_python_on_host')
+
+        self.__fingerprint = sha.hexdigest()
+        return self.__fingerprint
+
+    def invalidate(self) -> None:
+        """
+        Forgets the calculated fingerprint e.g. when the source code has changed.
+
+        :return: No return.
+        """
+        self.__fingerprint = None
+
+    def build_docker_image(self) -> str:
+        if self.pin_docker_image:
+            return DockerImageResolver.resolve(self.docker_image)
+
+        return self.docker_image
+
+    def dependencies_install_command(self) -> str:
         return PipInstall(
             dependencies=self.dependencies,
             additional_pip_install_args=self.additional_pip_install_args,
             output_directory=self.outputs_path
         ).build_command()
 
-    def __fresh_source_copy(self) -> None:
+    def __artifact_store(self) -> Optional[ArtifactStore]:
         """
-        Copies given lambda layer's source code to a directory where the Dockerfile is.
-        This way a Dockerfile can access source code and build it.
+        Unpinned ("latest") dependencies are only a part of the fingerprint by name, hence
+        a shared store would serve the first ever resolved versions forever. Such layers
+        are never fetched from or stored in the artifact store.
+        """
+        if not self.artifact_store:
+            return None
 
-        :return: No return.
+        unpinned = [dependency.build_string() for dependency in self.dependencies or [] if not dependency.is_pinned()]
+        if unpinned:
+            LOGGER.info(f'Layer ({self.name}) has unpinned dependencies {unpinned}. Artifact store is not used.')
+            return None
+
+        return self.artifact_store
+
+    def __fetch(self, fingerprint: str, destination_path: str) -> bool:
+        artifact_store = self.__artifact_store()
+        if not artifact_store:
+            return False
+
+        try:
+            return artifact_store.fetch(fingerprint, destination_path)
+        except Exception as ex:
+            # A broken cache must never break the build.
+            LOGGER.warning(f'Failed to restore layer ({fingerprint}) from the artifact store: {repr(ex)}.')
+            shutil.rmtree(destination_path, ignore_errors=True)
+            return False
+
+    def __store(self, fingerprint: str, source_path: str) -> None:
+        artifact_store = self.__artifact_store()
+        if not artifact_store:
+            return
+
+        try:
+            artifact_store.store(fingerprint, source_path)
+        except Exception as ex:
+            LOGGER.warning(f'Failed to store layer ({fingerprint}) in the artifact store: {repr(ex)}.')
+
+    def __build(self, fingerprint: str, output_path: str) -> None:
+        if self.install_pure_python_on_host and self.dependencies:
+            if self.python_version:
+                try:
+                    self.__split_build(fingerprint, output_path)
+                    return
+                except Exception as ex:
+                    LOGGER.warning(f'Host installation failed, falling back to docker build: {repr(ex)}.')
+                    shutil.rmtree(output_path, ignore_errors=True)
+            else:
+                LOGGER.warning(f'Unknown python version of ({self.docker_image}). Using docker build only.')
+
+        self.__docker_build(fingerprint, output_path)
+
+    def __split_build(self, fingerprint: str, output_path: str) -> None:
+        """
+        Resolves all dependencies once and installs the resolved distributions that ship
+        target platform wheels on the host, while the ones that need a Linux build environment
+        are installed by docker in parallel. Both sides install exactly the resolved versions,
+        without resolving dependencies on their own. Outputs are merged afterwards.
         """
-        # Give a unique directory for every source.
-        docker_layer_build_dir = f'{docker_build_root}/{self.source_path_dir_name}'
+        wheels, builds = DependencyClassifier(
+            python_version=self.python_version,
+            additional_pip_install_args=self.additional_pip_install_args
+        ).split(self.dependencies)
+
+        LOGGER.info(
+            f'Layer ({self.name}): resolved {len(wheels)} distributions with wheels and {len(builds)} to build.'
+        )
+
+        if not wheels:
+            self.__docker_build(fingerprint, output_path)
+            return
+
+        python_dir_name = os.path.basename(self.outputs_path)
+        host_path = f'{output_path}.host'
+
+        host_build = HostBuild(
+            python_version=self.python_version,
+            dependencies=wheels,
+            additional_pip_install_args=self.additional_pip_install_args
+        )
+
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                host_future = executor.submit(host_build.install_dependencies, os.path.join(host_path, python_dir_name))
+
+                docker_future = None
+                if builds:
+                    build_install_command = PipInstall(
+                        dependencies=builds,
+                        additional_pip_install_args=' '.join(filter(None, [self.additional_pip_install_args, '--no-deps'])),
+                        output_directory=self.outputs_path
+                    ).build_command()
+
+                    docker_future = executor.submit(self.__docker_build, fingerprint, output_path, build_install_command)
+
+                host_future.result()
+                if docker_future:
+                    docker_future.result()
+
+            if not builds:
+                # Docker is not needed at all. Do what the Dockerfile would do.
+                HostBuild.copy_source(self.source_path, os.path.join(output_path, python_dir_name))
 
-        # Delete previous copied source.
-        shutil.rmtree(docker_layer_build_dir, ignore_errors=True)
+            HostBuild.cleanup(host_path)
+            HostBuild.cleanup(output_path)
+
+            HostBuild.merge(host_path, output_path)
+        finally:
+            shutil.rmtree(host_path, ignore_errors=True)
+
+    def __docker_build(self, fingerprint: str, output_path: str, pip_install: Optional[str] = None) -> None:
+        # Before building, ensure source code is available for Dockerfile.
+        build_context = self.__fresh_source_copy()
+
+        # Now, after the source code was made available. Build the code with Docker.
+        log_parser = BuildLogParser(layer_name=self.name, on_event=self.on_build_event)
+        try:
+            DockerBuild(
+                context_path=build_context,
+                dockerfile_path=f'{root}/Dockerfile',
+                build_args=self.__build_args(pip_install)
+            ).build(output_path=output_path, on_output=log_parser.feed)
+        except Exception:
+            log_parser.close(failed=True)
+            raise
+        finally:
+            shutil.rmtree(build_context, ignore_errors=True)
+
+        log_parser.close()
+
+    def __build_args(self, pip_install: Optional[str] = None) -> Dict[str, str]:
+        return {
+            # Custom docker image. Pinned image digest is also a part of the docker build cache key.
+            'DOCKER_IMAGE': self.build_docker_image(),
+
+            # OS-level paths (relative to the build context).
+            'INPUTS_PATH': f'./{self.source_path_dir_name}',
+
+            # Docker container-level paths.
+            'OUTPUTS_PATH': self.outputs_path,
+
+            # Prebuilt commands to install.
+            'PIP_INSTALL': pip_install or self.dependencies_install_command(),
+        }
+
+    def __source_hash(self) -> str:
+        sha = hashlib.sha256()
+
+        for directory, dir_names, file_names in os.walk(self.source_path):
+            # Compiled python files are deleted from the layer anyway.
+            dir_names[:] = sorted(name for name in dir_names if name != '__pycache__')
+
+            for file_name in sorted(file_names):
+                if file_name.endswith(('.pyc', '.pyo')):
+                    continue
+
+                path = os.path.join(directory, file_name)
+                sha.update(os.path.relpath(path, self.source_path).encode())
+                sha.update(FileDigestCache.digest(path).encode())
+
+        return sha.hexdigest()
+
+    def __fresh_source_copy(self) -> str:
+        """
+        Copies given lambda layer's source code to a directory that is used as a docker build context.
+        This way a Dockerfile can access source code and build it.
+
+        :return: Path to the docker build context.
+        """
+        # Give a unique directory for every build, so that concurrent builds
+        # (even of the same source, in other processes) never touch each other's files.
+        docker_layer_build_dir = tempfile.mkdtemp(dir=docker_build_root, prefix=f'{self.fingerprint()[:16]}-')
 
         # Copy a fresh source.
         shutil.copytree(
@@ -90,6 +395,10 @@ class LambdaLayerCode:
             # Duplicate parent dir so the source code could be imported as
             # "from parent.module import Module" instead of
             # "from module import Module".
-            dst=f'{docker_layer_build_dir}/{self.source_path_dir_name}',
+            # Docker "COPY" copies directory's contents, not the directory itself,
+            # hence the source is copied to "<context>/<name>/<name>".
+            dst=f'{docker_layer_build_dir}/{self.source_path_dir_name}/{self.source_path_dir_name}',
             dirs_exist_ok=True
         )
+
+        return docker_layer_build_dir
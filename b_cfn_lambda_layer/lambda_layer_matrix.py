@@ -0,0 +1,270 @@
+import hashlib
+import logging
+import os
+import uuid
+from collections import defaultdict
+from typing import List, Optional, Dict, Callable
+
+from aws_cdk import Stack
+from aws_cdk.aws_lambda import Runtime, Function
+
+from b_cfn_lambda_layer.artifact_store import ArtifactStore
+from b_cfn_lambda_layer.build_log import BuildEvent
+from b_cfn_lambda_layer.build_plan import BuildPlan
+from b_cfn_lambda_layer.dependency import Dependency
+from b_cfn_lambda_layer.lambda_layer import LambdaLayer
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+from b_cfn_lambda_layer.package_version import PackageVersion
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LambdaLayerMatrix:
+    """
+    Builds a layer once per distinct python version of given runtimes, so that
+    compiled packages and resolved dependency versions match every runtime.
+
+    Builds run in parallel and share caches. Runtimes whose builds produce identical
+    payloads share a single layer, otherwise separate layers are created.
+
+    The layer of the lowest python version always keeps the given name, so that it (and its
+    SSM parameter, that other stacks resolve) is not replaced when payloads start to differ.
+    """
+    DEFAULT_DOCKER_IMAGE_TEMPLATE = 'python:{python_version}'
+
+    def __init__(
+            self,
+            scope: Stack,
+            name: str,
+            source_path: Optional[str] = None,
+            code_runtimes: Optional[List[Runtime]] = None,
+            dependencies: Optional[Dict[str, PackageVersion]] = None,
+            additional_pip_install_args: Optional[str] = None,
+            docker_image_template: Optional[str] = None,
+            pin_docker_image: bool = True,
+            artifact_store: Optional[ArtifactStore] = None,
+            on_build_event: Optional[Callable[[BuildEvent], None]] = None,
+            install_pure_python_on_host: bool = False,
+            lazy_ssm_parameter: bool = False,
+            max_workers: Optional[int] = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param scope: Parent CloudFormation stack.
+        :param name: Unique name of the layer. If separate layers are needed, the lowest
+            python version of every other layer is appended to the name e.g. "MyLayerPy310".
+        :param source_path: Path to source-code to be bundled.
+        :param code_runtimes: Available runtimes for your code.
+        :param dependencies: A dictionary of dependencies to include in the layer.
+            Keys are dependency (package) names.
+            Values are dependency (package) version objects.
+        :param additional_pip_install_args: A string of additional pip-install arguments.
+        :param docker_image_template: Docker image to use for every python version,
+            e.g. "python:{python_version}-slim". Default - "python:{python_version}".
+        :param pin_docker_image: Resolve docker images to immutable digests before building.
+        :param artifact_store: A store of built layer outputs to consult before building.
+        :param on_build_event: Callback receiving timed docker build steps.
+        :param install_pure_python_on_host: Install dependencies with wheels on the host.
+        :param lazy_ssm_parameter: Create layers' SSM parameters only when layers are shared.
+        :param max_workers: Maximum number of parallel docker builds.
+        """
+        docker_image_template = docker_image_template or self.DEFAULT_DOCKER_IMAGE_TEMPLATE
+
+        runtimes_by_version: Dict[str, List[Runtime]] = defaultdict(list)
+        for runtime in code_runtimes or LambdaLayer.default_runtimes():
+            runtimes_by_version[self.python_version(runtime)].append(runtime)
+
+        codes = {
+            python_version: LambdaLayerCode(
+                source_path=source_path,
+                additional_pip_install_args=additional_pip_install_args,
+                dependencies=[Dependency(key, value) for key, value in (dependencies or {}).items()],
+                docker_image=docker_image_template.format(python_version=python_version),
+                pin_docker_image=pin_docker_image,
+                artifact_store=artifact_store,
+                name=name,
+                on_build_event=on_build_event,
+                install_pure_python_on_host=install_pure_python_on_host
+            )
+            for python_version in runtimes_by_version
+        }
+
+        artifacts = BuildPlan(codes=list(codes.values()), max_workers=max_workers).execute()
+
+        # Payload hash -> python versions producing that payload.
+        versions_by_payload: Dict[str, List[str]] = defaultdict(list)
+        for python_version, code in codes.items():
+            payload_hash = self.__cached_payload_hash(artifacts[code.fingerprint()])
+            versions_by_payload[payload_hash].append(python_version)
+
+        LOGGER.info(
+            f'Layer ({name}): {len(codes)} python version(s) produced '
+            f'{len(versions_by_payload)} distinct payload(s).'
+        )
+
+        self.__layers: Dict[str, LambdaLayer] = {}
+
+        lowest_version = min(codes, key=self.__version_key)
+
+        for python_versions in versions_by_payload.values():
+            python_versions = sorted(python_versions, key=self.__version_key)
+
+            layer_name = name
+            if lowest_version not in python_versions:
+                layer_name = f'{name}Py{python_versions[0].replace(".", "")}'
+
+            # All code objects of the group produce the same payload, any of them is already built.
+            layer = LambdaLayer(
+                scope=scope,
+                name=layer_name,
+                source_path=source_path,
+                code_runtimes=[runtime for version in python_versions for runtime in runtimes_by_version[version]],
+                dependencies=dependencies,
+                additional_pip_install_args=additional_pip_install_args,
+                docker_image=codes[python_versions[0]].docker_image,
+                pin_docker_image=pin_docker_image,
+                artifact_store=artifact_store,
+                on_build_event=on_build_event,
+                install_pure_python_on_host=install_pure_python_on_host,
+                lazy_ssm_parameter=lazy_ssm_parameter
+            )
+
+            for python_version in python_versions:
+                self.__layers[python_version] = layer
+
+    @property
+    def layers(self) -> List[LambdaLayer]:
+        """
+        Distinct layers of this matrix.
+
+        :return: A list of layers.
+        """
+        return list({id(layer): layer for layer in self.__layers.values()}.values())
+
+    def layer_for(self, runtime: Runtime) -> LambdaLayer:
+        """
+        Returns a layer built for a given runtime.
+
+        :param runtime: Lambda runtime.
+
+        :return: Layer compatible with the runtime.
+        """
+        python_version = self.python_version(runtime)
+
+        if python_version not in self.__layers:
+            raise ValueError(f'Runtime ({runtime.name}) is not a part of this layer matrix.')
+
+        return self.__layers[python_version]
+
+    def add_to_function(self, *functions: Function) -> None:
+        """
+        Adds a layer matching function's runtime to given lambda function(s).
+        See LambdaLayer.add_to_function.
+
+        :param functions: Lambda function(s) to which the layer should be added.
+
+        :return: No return.
+        """
+        for function in functions:
+            self.layer_for(function.runtime).add_to_function(function)
+
+    @staticmethod
+    def python_version(runtime: Runtime) -> str:
+        """
+        Python version of a runtime e.g. "3.9" for "python3.9".
+
+        :param runtime: Lambda runtime.
+
+        :return: Python version.
+        """
+        if not runtime.name.startswith('python'):
+            raise ValueError(f'Runtime ({runtime.name}) is not a python runtime.')
+
+        return runtime.name[len('python'):]
+
+    @staticmethod
+    def __version_key(python_version: str) -> tuple:
+        return tuple(map(int, python_version.split('.')))
+
+    @staticmethod
+    def __cached_payload_hash(artifact_path: str) -> str:
+        """
+        Published artifacts never change, hence a payload hash is cached next to the artifact.
+        The artifact directory's identity is kept with the hash, in case the artifact is rebuilt.
+        """
+        hash_path = f'{artifact_path}.payload'
+        stat = os.stat(artifact_path)
+        identity = f'{stat.st_ino}:{stat.st_mtime_ns}'
+
+        try:
+            with open(hash_path) as file:
+                cached_identity, payload_hash = file.read().split()
+
+            if cached_identity == identity:
+                return payload_hash
+        except (OSError, ValueError):
+            pass
+
+        payload_hash = LambdaLayerMatrix.__payload_hash(artifact_path)
+
+        # Write to a temporary file and replace so readers never see a partial file.
+        temporary_file = f'{hash_path}.{uuid.uuid4().hex}.tmp'
+        with open(temporary_file, 'w') as file:
+            file.write(f'{identity} {payload_hash}\n')
+
+        os.replace(temporary_file, hash_path)
+        return payload_hash
+
+    @staticmethod
+    def __payload_hash(artifact_path: str) -> str:
+        """
+        Hashes layer's contents. Installation metadata of distributions is normalized,
+        since it differs for every python version even if the installed files do not.
+        """
+        sha = hashlib.sha256()
+
+        for directory, dir_names, file_names in os.walk(artifact_path):
+            # Compiled python files are deleted from the layer anyway.
+            dir_names[:] = sorted(name for name in dir_names if name != '__pycache__')
+
+            for file_name in sorted(file_names):
+                if file_name.endswith(('.pyc', '.pyo')):
+                    continue
+
+                path = os.path.join(directory, file_name)
+                sha.update(os.path.relpath(path, artifact_path).encode())
+
+                if os.path.islink(path):
+                    sha.update(os.readlink(path).encode())
+                elif directory.endswith('.dist-info') and file_name == 'RECORD':
+                    sha.update(LambdaLayerMatrix.__normalized_record(path))
+                elif directory.endswith('.dist-info') and file_name == 'INSTALLER':
+                    # Names the tool that installed the distribution, not a part of the payload.
+                    continue
+                else:
+                    with open(path, 'rb') as file:
+                        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                            sha.update(chunk)
+
+        return sha.hexdigest()
+
+    @staticmethod
+    def __normalized_record(path: str) -> bytes:
+        """
+        Pip records files it compiled while installing (e.g. "__pycache__/module.cpython-39.pyc"),
+        hence RECORD differs for every python version, although compiled files are deleted.
+        """
+        with open(path, 'rb') as file:
+            lines = file.read().splitlines()
+
+        kept = []
+        for line in lines:
+            recorded_path = line.split(b',')[0]
+
+            if b'__pycache__/' in recorded_path or recorded_path.endswith((b'.pyc', b'.pyo')):
+                continue
+
+            kept.append(line)
+
+        return b'\n'.join(sorted(kept))
@@ -0,0 +1,265 @@
+import ast
+import hashlib
+import logging
+import os
+import re
+import shutil
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Iterable, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LayerSlimmer:
+    """
+    Creates a slimmed copy of a built layer that contains only the packages
+    reachable from a given handler code.
+
+    Reachability is determined statically: imports of the handler code are
+    followed transitively through the layer's packages. Whole distributions
+    (and their declared requirements) are kept, so that package metadata,
+    vendored shared libraries and data files stay intact.
+    """
+    PYTHON_DIR_NAME = 'python'
+
+    # (file path, modification time, size) -> imported top-level modules.
+    # The same packages are analyzed for many functions, hence parsed imports are cached.
+    __file_imports_cache: Dict[Tuple[str, int, int], Set[str]] = {}
+
+    def __init__(self, layer_path: str) -> None:
+        """
+        Constructor.
+
+        :param layer_path: Path to a built layer (a directory containing "python" directory).
+        """
+        self.__layer_path = layer_path
+        self.__python_path = os.path.join(layer_path, self.PYTHON_DIR_NAME)
+
+        # Top-level module name -> layer entries (files or directories) providing it.
+        self.__modules: Dict[str, Set[str]] = defaultdict(set)
+        # Layer entry -> distribution (dist-info directory) that owns it.
+        self.__owners: Dict[str, str] = {}
+        # Distribution -> layer entries it owns (including the dist-info directory itself).
+        self.__distributions: Dict[str, Set[str]] = defaultdict(set)
+        # Normalized distribution name -> distribution.
+        self.__distribution_names: Dict[str, str] = {}
+
+        self.__index()
+
+    def reachable(self, handler_path: str, extra_modules: Optional[List[str]] = None) -> Set[str]:
+        """
+        Finds layer entries reachable from the handler code.
+
+        :param handler_path: Path to a handler file or a directory with handler code.
+        :param extra_modules: Top-level modules to include regardless of the analysis
+            e.g. modules that are imported dynamically.
+
+        :return: A set of layer entry names (relative to the layer's python directory).
+        """
+        pending = set(self.__imports(self.__python_files(handler_path))) | set(extra_modules or [])
+        visited_modules: Set[str] = set()
+        entries: Set[str] = set()
+
+        while pending:
+            module = pending.pop()
+
+            if module in visited_modules or module not in self.__modules:
+                continue
+
+            visited_modules.add(module)
+
+            for entry in self.__modules[module]:
+                for kept_entry in self.__with_distribution(entry):
+                    if kept_entry in entries:
+                        continue
+
+                    entries.add(kept_entry)
+                    path = os.path.join(self.__python_path, kept_entry)
+                    pending.update(self.__imports(self.__python_files(path)))
+                    pending.update(self.__top_level_names(kept_entry))
+
+        return entries
+
+    def slim(self, entries: Set[str], output_root: str) -> str:
+        """
+        Copies given layer entries to a new layer directory. Slimmed layers are cached
+        under a hash of the source layer and the entries, hence functions with the
+        same set of reachable packages share the same slimmed layer.
+
+        :param entries: Layer entries to keep.
+        :param output_root: Directory in which slimmed layers are kept.
+
+        :return: Path to the slimmed layer.
+        """
+        sha = hashlib.sha256(os.path.basename(os.path.normpath(self.__layer_path)).encode())
+        for entry in sorted(entries):
+            sha.update(f'{entry}\n'.encode())
+
+        output_path = os.path.join(output_root, f'{sha.hexdigest()}.slim')
+
+        if os.path.isdir(output_path):
+            return output_path
+
+        temporary_path = f'{output_path}.{uuid.uuid4().hex}.tmp'
+        os.makedirs(os.path.join(temporary_path, self.PYTHON_DIR_NAME))
+
+        for entry in sorted(entries):
+            source = os.path.join(self.__python_path, entry)
+            destination = os.path.join(temporary_path, self.PYTHON_DIR_NAME, entry)
+
+            if os.path.isdir(source):
+                shutil.copytree(source, destination, symlinks=True)
+            else:
+                shutil.copy2(source, destination)
+
+        try:
+            os.replace(temporary_path, output_path)
+        except OSError:
+            # Published by someone else in the meantime.
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+        LOGGER.info(f'Slimmed layer: kept {len(entries)} of {len(os.listdir(self.__python_path))} entries.')
+        return output_path
+
+    def __index(self) -> None:
+        for entry in os.listdir(self.__python_path):
+            path = os.path.join(self.__python_path, entry)
+
+            if entry.endswith('.dist-info'):
+                self.__index_distribution(entry)
+            elif os.path.isdir(path):
+                self.__modules[entry].add(entry)
+            elif entry.endswith('.py') or entry.endswith(('.so', '.pyd')):
+                self.__modules[entry.split('.')[0]].add(entry)
+
+    def __index_distribution(self, distribution: str) -> None:
+        name = distribution[:-len('.dist-info')].rsplit('-', 1)[0]
+        self.__distribution_names[self.__normalize(name)] = distribution
+        self.__distributions[distribution].add(distribution)
+
+        try:
+            with open(os.path.join(self.__python_path, distribution, 'RECORD')) as file:
+                lines = file.read().splitlines()
+        except OSError:
+            return
+
+        for line in lines:
+            path = line.split(',')[0]
+            entry = path.split('/')[0]
+
+            # Paths outside of the layer (e.g. "../../bin/script") are ignored.
+            if not entry or entry == '..' or not os.path.exists(os.path.join(self.__python_path, entry)):
+                continue
+
+            self.__owners[entry] = distribution
+            self.__distributions[distribution].add(entry)
+
+    def __with_distribution(self, entry: str) -> Set[str]:
+        """
+        Returns all entries of the entry's distribution and of the distributions it requires.
+        """
+        distribution = self.__owners.get(entry)
+        if not distribution:
+            return {entry}
+
+        entries = {entry}
+        pending = [distribution]
+        visited = set()
+
+        while pending:
+            distribution = pending.pop()
+            if distribution in visited:
+                continue
+
+            visited.add(distribution)
+            entries.update(self.__distributions[distribution])
+
+            for requirement in self.__requirements(distribution):
+                required = self.__distribution_names.get(self.__normalize(requirement))
+                if required:
+                    pending.append(required)
+
+        return entries
+
+    def __requirements(self, distribution: str) -> List[str]:
+        try:
+            with open(os.path.join(self.__python_path, distribution, 'METADATA'), encoding='utf-8') as file:
+                lines = file.read().split('\n\n')[0].splitlines()
+        except OSError:
+            return []
+
+        requirements = []
+        for line in lines:
+            # Requirements needed only for extras are skipped.
+            if line.startswith('Requires-Dist:') and 'extra ==' not in line:
+                requirements.append(re.split(r'[\s;(<>=!~\[]', line[len('Requires-Dist:'):].strip())[0])
+
+        return requirements
+
+    def __top_level_names(self, entry: str) -> Set[str]:
+        return {module for module, entries in self.__modules.items() if entry in entries}
+
+    @staticmethod
+    def __normalize(name: str) -> str:
+        return re.sub(r'[-_.]+', '-', name).lower()
+
+    @staticmethod
+    def __python_files(path: str) -> Iterable[str]:
+        if os.path.isfile(path):
+            if path.endswith('.py'):
+                yield path
+            return
+
+        for directory, dir_names, file_names in os.walk(path):
+            dir_names[:] = [name for name in dir_names if name != '__pycache__']
+
+            for file_name in file_names:
+                if file_name.endswith('.py'):
+                    yield os.path.join(directory, file_name)
+
+    @staticmethod
+    def __imports(paths: Iterable[str]) -> Set[str]:
+        """
+        Collects absolute top-level module names imported by given python files.
+        Calls like importlib.import_module('name') with a literal name are detected too.
+        """
+        modules = set()
+
+        for path in paths:
+            for module in LayerSlimmer.__file_imports(path):
+                modules.add(module)
+
+        return modules
+
+    @staticmethod
+    def __file_imports(path: str) -> Set[str]:
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+
+        cached = LayerSlimmer.__file_imports_cache.get(key)
+        if cached is not None:
+            return cached
+
+        modules = set()
+
+        try:
+            with open(path, 'rb') as file:
+                tree = ast.parse(file.read())
+        except (SyntaxError, ValueError, OSError):
+            # E.g. python2-only files that are never imported anyway.
+            tree = None
+
+        for node in ast.walk(tree) if tree else []:
+            if isinstance(node, ast.Import):
+                modules.update(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                modules.add(node.module.split('.')[0])
+            elif isinstance(node, ast.Call) and node.args and isinstance(node.args[0], ast.Constant):
+                function = node.func
+                name = function.attr if isinstance(function, ast.Attribute) else getattr(function, 'id', None)
+                if name in ('import_module', '__import__') and isinstance(node.args[0].value, str):
+                    modules.add(node.args[0].value.split('.')[0])
+
+        LayerSlimmer.__file_imports_cache[key] = modules
+        return modules
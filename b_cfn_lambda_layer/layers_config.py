@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, Any, Optional, List, Callable, TYPE_CHECKING
+
+from b_cfn_lambda_layer.artifact_store import ArtifactStore
+from b_cfn_lambda_layer.build_log import BuildEvent
+from b_cfn_lambda_layer.build_plan import BuildPlan
+from b_cfn_lambda_layer.dependency import Dependency
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+from b_cfn_lambda_layer.package_version import PackageVersion
+
+if TYPE_CHECKING:
+    from aws_cdk import Stack
+    from aws_cdk.aws_lambda import Runtime
+    from b_cfn_lambda_layer.lambda_layer import LambdaLayer
+
+
+class LayersConfig:
+    """
+    Declares many lambda layers at once. An example of a YAML layers file:
+
+    defaults:
+      docker_image: python:3.9
+      code_runtimes: [python3.8, python3.9]
+    layers:
+      JoseLayer:
+        source_path: ./jose_layer
+        dependencies:
+          python-jose: 3.3.0
+          boto3: latest
+
+    TOML layers files have exactly the same structure.
+
+    Dependency versions must be strings (or "latest", or false to not install).
+    Quote numeric looking versions, because e.g. an unquoted YAML 1.10 is a float 1.1.
+    """
+    SUPPORTED_KEYS = {
+        'source_path',
+        'code_runtimes',
+        'dependencies',
+        'additional_pip_install_args',
+        'docker_image',
+        'pin_docker_image',
+        'install_pure_python_on_host',
+        'lazy_ssm_parameter',
+    }
+
+    def __init__(self, layers: Dict[str, Dict[str, Any]], defaults: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Constructor.
+
+        :param layers: A dictionary of layer declarations.
+            Keys are unique layer names.
+            Values are layer parameters (see SUPPORTED_KEYS).
+        :param defaults: Parameters applied to every layer unless overridden.
+        """
+        self.__layers: Dict[str, Dict[str, Any]] = {}
+
+        for name, layer in layers.items():
+            params = {**(defaults or {}), **(layer or {})}
+
+            unsupported = set(params) - self.SUPPORTED_KEYS
+            if unsupported:
+                raise ValueError(f'Layer ({name}) has unsupported keys: {sorted(unsupported)}.')
+
+            # Fail early on invalid dependency versions.
+            self.__dependencies(params)
+
+            self.__layers[name] = params
+
+    @classmethod
+    def from_file(cls, path: str) -> LayersConfig:
+        """
+        Loads a YAML (.yaml, .yml) or TOML (.toml) layers file.
+        Relative source paths (of layers and of defaults) are resolved against the file's directory.
+
+        :param path: Path to the layers file.
+
+        :return: Layers config instance.
+        """
+        extension = os.path.splitext(path)[1].lower()
+
+        if extension in ('.yaml', '.yml'):
+            import yaml
+
+            with open(path) as file:
+                data = yaml.safe_load(file) or {}
+        elif extension == '.toml':
+            try:
+                import tomllib
+            except ImportError:
+                import tomli as tomllib
+
+            with open(path, 'rb') as file:
+                data = tomllib.load(file)
+        else:
+            raise ValueError(f'Unsupported layers file type: ({extension}).')
+
+        base_path = os.path.dirname(os.path.abspath(path))
+        layers = data.get('layers') or {}
+        defaults = data.get('defaults')
+
+        for params in [defaults, *layers.values()]:
+            source_path = (params or {}).get('source_path')
+            if source_path:
+                params['source_path'] = os.path.join(base_path, source_path)
+
+        return cls(layers=layers, defaults=defaults)
+
+    def codes(
+            self,
+            artifact_store: Optional[ArtifactStore] = None,
+            on_build_event: Optional[Callable[[BuildEvent], None]] = None
+    ) -> Dict[str, LambdaLayerCode]:
+        """
+        Creates lambda layer code objects for every declared layer.
+
+        :param artifact_store: A store of built layer outputs to consult before building.
+        :param on_build_event: Callback receiving timed docker build steps.
+
+        :return: A map of layer names to layer code objects.
+        """
+        return {
+            name: LambdaLayerCode(
+                source_path=params.get('source_path'),
+                additional_pip_install_args=params.get('additional_pip_install_args'),
+                dependencies=[Dependency(key, value) for key, value in self.__dependencies(params).items()],
+                docker_image=params.get('docker_image'),
+                pin_docker_image=params.get('pin_docker_image', True),
+                artifact_store=artifact_store,
+                name=name,
+                on_build_event=on_build_event,
+                install_pure_python_on_host=params.get('install_pure_python_on_host', False)
+            )
+            for name, params in self.__layers.items()
+        }
+
+    def create(
+            self,
+            scope: Stack,
+            name_prefix: Optional[str] = None,
+            max_workers: Optional[int] = None,
+            artifact_store: Optional[ArtifactStore] = None,
+            on_build_event: Optional[Callable[[BuildEvent], None]] = None
+    ) -> Dict[str, LambdaLayer]:
+        """
+        Builds all distinct layers in parallel and then creates layer resources.
+
+        :param scope: Parent CloudFormation stack.
+        :param name_prefix: A prefix to add to every layer resource name.
+        :param max_workers: Maximum number of parallel docker builds.
+        :param artifact_store: A store of built layer outputs to consult before building.
+        :param on_build_event: Callback receiving timed docker build steps.
+
+        :return: A map of layer names to layer resources.
+        """
+        from b_cfn_lambda_layer.lambda_layer import LambdaLayer
+
+        codes = self.codes(artifact_store=artifact_store, on_build_event=on_build_event)
+        BuildPlan(codes=list(codes.values()), max_workers=max_workers).execute()
+
+        # Layer resources are created sequentially, but their code is already built at this point.
+        return {
+            name: LambdaLayer(
+                scope=scope,
+                name=f'{name_prefix or ""}{name}',
+                source_path=params.get('source_path'),
+                code_runtimes=self.__runtimes(params),
+                dependencies=self.__dependencies(params),
+                additional_pip_install_args=params.get('additional_pip_install_args'),
+                docker_image=params.get('docker_image'),
+                pin_docker_image=params.get('pin_docker_image', True),
+                artifact_store=artifact_store,
+                on_build_event=on_build_event,
+                install_pure_python_on_host=params.get('install_pure_python_on_host', False),
+                lazy_ssm_parameter=params.get('lazy_ssm_parameter', False)
+            )
+            for name, params in self.__layers.items()
+        }
+
+    @staticmethod
+    def __dependencies(params: Dict[str, Any]) -> Dict[str, PackageVersion]:
+        dependencies = {}
+
+        for name, version in (params.get('dependencies') or {}).items():
+            if version is None or version == 'latest':
+                dependencies[name] = PackageVersion.latest()
+            elif version is False:
+                dependencies[name] = PackageVersion.dont_install()
+            elif isinstance(version, str):
+                dependencies[name] = PackageVersion.from_string_version(version)
+            else:
+                # A number can not be turned back into the intended version e.g. 1.10 is parsed as 1.1.
+                raise ValueError(
+                    f'Dependency ({name}) version ({version!r}) must be a string. '
+                    f'Quote the version e.g. "{version}".'
+                )
+
+        return dependencies
+
+    @staticmethod
+    def __runtimes(params: Dict[str, Any]) -> Optional[List[Runtime]]:
+        from aws_cdk.aws_lambda import Runtime, RuntimeFamily
+
+        runtimes = params.get('code_runtimes')
+
+        if not runtimes:
+            return None
+
+        return [Runtime(runtime, RuntimeFamily.PYTHON) for runtime in runtimes]
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Optional, Tuple
+
+from b_cfn_lambda_layer.build_plan import BuildPlan
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+
+LOGGER = logging.getLogger(__name__)
+
+# File path -> (modification time in nanoseconds, size).
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+class LayersWatcher:
+    """
+    Watches layers' source code and rebuilds, in the background, only the layers
+    whose inputs have changed. Run it next to "cdk watch" (or before "cdk synth"),
+    so that the synth finds every layer already built.
+
+    Builds are published under their input fingerprint (see LambdaLayerCode.build_artifact)
+    with an atomic rename, which is exactly where the synth looks for them. Hence the synth
+    sees either no build (and builds the layer itself) or a complete one, never a partial one.
+
+    Only layers that the synth creates with the same build parameters are picked up,
+    since build parameters are a part of the fingerprint. The command line watches
+    layers declared in a layers file (see LayersConfig), which "LayersConfig.create"
+    also uses. Layers created with LambdaLayer directly can be watched by passing
+    LambdaLayerCode objects with the same parameters to the constructor.
+    """
+
+    def __init__(
+            self,
+            codes: Dict[str, LambdaLayerCode],
+            interval: float = 0.5,
+            max_workers: Optional[int] = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param codes: A map of layer names to layer code objects to watch.
+        :param interval: Polling interval in seconds.
+        :param max_workers: Maximum number of parallel docker builds.
+        """
+        self.__codes = codes
+        self.__interval = interval
+        self.__max_workers = max_workers
+
+        self.__snapshots: Dict[str, Snapshot] = {name: self.__snapshot(code) for name, code in codes.items()}
+        self.__builds: Dict[str, Future] = {}
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> LayersWatcher:
+        """
+        Creates a watcher for all layers declared in a layers file.
+
+        :param path: Path to a YAML or TOML layers file.
+        :param kwargs: Other constructor arguments.
+
+        :return: Watcher instance.
+        """
+        from b_cfn_lambda_layer.layers_config import LayersConfig
+
+        return cls(codes=LayersConfig.from_file(path).codes(), **kwargs)
+
+    def poll(self) -> Dict[str, LambdaLayerCode]:
+        """
+        Checks which layers have changed since the last poll.
+        Only file modification times and sizes are compared, files are not read.
+
+        :return: A map of changed layer names to their code objects.
+        """
+        changed = {}
+
+        for name, code in self.__codes.items():
+            snapshot = self.__snapshot(code)
+
+            if snapshot != self.__snapshots[name]:
+                self.__snapshots[name] = snapshot
+                changed[name] = code
+
+        return changed
+
+    def run(self) -> None:
+        """
+        Builds all layers and then keeps rebuilding changed layers until interrupted.
+
+        :return: No return.
+        """
+        BuildPlan(codes=list(self.__codes.values()), max_workers=self.__max_workers).execute()
+
+        LOGGER.info(f'Watching {len(self.__codes)} layer(s) for changes.')
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            try:
+                while True:
+                    for name, code in self.poll().items():
+                        self.__schedule(executor, name, code)
+
+                    time.sleep(self.__interval)
+            except KeyboardInterrupt:
+                LOGGER.info('Stopped watching layers.')
+
+    def __schedule(self, executor: ThreadPoolExecutor, name: str, code: LambdaLayerCode) -> None:
+        previous = self.__builds.get(name)
+
+        # If the layer is still being rebuilt, the change is picked up on the next poll.
+        if previous and not previous.done():
+            self.__snapshots[name] = {}
+            return
+
+        LOGGER.info(f'Layer ({name}) has changed. Rebuilding.')
+        self.__builds[name] = executor.submit(self.__rebuild, name, code)
+
+    def __rebuild(self, name: str, code: LambdaLayerCode) -> None:
+        started = time.perf_counter()
+
+        try:
+            code.invalidate()
+            code.build_artifact()
+        except Exception as ex:
+            LOGGER.error(f'Failed to rebuild layer ({name}): {repr(ex)}.')
+            return
+
+        LOGGER.info(f'Layer ({name}) rebuilt in {time.perf_counter() - started:.2f}s.')
+
+    @staticmethod
+    def __snapshot(code: LambdaLayerCode) -> Snapshot:
+        snapshot = {}
+
+        for directory, dir_names, file_names in os.walk(code.source_path):
+            dir_names[:] = [name for name in dir_names if name != '__pycache__']
+
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+        return snapshot
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)8s] %(message)s')
+
+    parser = argparse.ArgumentParser(description='Rebuild lambda layers declared in a layers file on changes.')
+    parser.add_argument('layers_file', help='Path to a YAML or TOML layers file.')
+    parser.add_argument('--interval', type=float, default=0.5, help='Polling interval in seconds.')
+    parser.add_argument('--max-workers', type=int, default=None, help='Maximum number of parallel docker builds.')
+    arguments = parser.parse_args()
+
+    LayersWatcher.from_file(arguments.layers_file, interval=arguments.interval, max_workers=arguments.max_workers).run()
@@ -0,0 +1,45 @@
+import logging
+import os
+import uuid
+
+from b_cfn_lambda_layer.artifact_store import ArtifactStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LocalArtifactStore(ArtifactStore):
+    def __init__(self, root_path: str) -> None:
+        """
+        Constructor.
+
+        :param root_path: Directory in which layer output archives are kept.
+            Usually, a directory that is preserved between CI pipeline runs.
+        """
+        self.__root_path = root_path
+
+    def fetch(self, fingerprint: str, destination_path: str) -> bool:
+        try:
+            with open(self.__archive_path(fingerprint), 'rb') as file:
+                self.unpack(file, destination_path)
+        except FileNotFoundError:
+            return False
+
+        LOGGER.info(f'Restored layer ({fingerprint}) from ({self.__root_path}).')
+        return True
+
+    def store(self, fingerprint: str, source_path: str) -> None:
+        os.makedirs(self.__root_path, exist_ok=True)
+
+        archive_path = self.__archive_path(fingerprint)
+        temporary_path = f'{archive_path}.{uuid.uuid4().hex}.tmp'
+
+        with open(temporary_path, 'wb') as file:
+            self.pack(source_path, file)
+
+        # Publish atomically, so that readers never see a partial archive.
+        os.replace(temporary_path, archive_path)
+
+        LOGGER.info(f'Stored layer ({fingerprint}) in ({self.__root_path}).')
+
+    def __archive_path(self, fingerprint: str) -> str:
+        return os.path.join(self.__root_path, f'{fingerprint}.tar.gz')
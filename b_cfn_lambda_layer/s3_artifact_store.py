@@ -0,0 +1,67 @@
+import logging
+import tempfile
+from typing import Optional, Any
+
+from b_cfn_lambda_layer.artifact_store import ArtifactStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+class S3ArtifactStore(ArtifactStore):
+    def __init__(
+            self,
+            bucket: str,
+            prefix: Optional[str] = None,
+            endpoint_url: Optional[str] = None,
+            client: Optional[Any] = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param bucket: Name of the bucket in which layer output archives are kept.
+        :param prefix: Key prefix (a "directory") of the archives e.g. "layers".
+        :param endpoint_url: Endpoint of an S3-compatible service e.g. MinIO.
+            If None - AWS S3 is used.
+        :param client: A preconfigured boto3 S3 client. If given, endpoint_url is ignored.
+        """
+        if client is None:
+            # Boto3 is an optional dependency, needed only for this store.
+            import boto3
+
+            client = boto3.client('s3', endpoint_url=endpoint_url)
+
+        self.__bucket = bucket
+        self.__prefix = (prefix or '').strip('/')
+        self.__client = client
+
+    def fetch(self, fingerprint: str, destination_path: str) -> bool:
+        try:
+            response = self.__client.get_object(Bucket=self.__bucket, Key=self.__key(fingerprint))
+        except self.__client.exceptions.NoSuchKey:
+            return False
+
+        # Body is streamed and extracted on the fly, without keeping the whole archive.
+        body = response['Body']
+        try:
+            self.unpack(body, destination_path)
+        finally:
+            body.close()
+
+        LOGGER.info(f'Restored layer ({fingerprint}) from (s3://{self.__bucket}/{self.__key(fingerprint)}).')
+        return True
+
+    def store(self, fingerprint: str, source_path: str) -> None:
+        with tempfile.TemporaryFile() as file:
+            self.pack(source_path, file)
+            file.seek(0)
+
+            # Multipart upload is used automatically for large archives.
+            self.__client.upload_fileobj(file, self.__bucket, self.__key(fingerprint))
+
+        LOGGER.info(f'Stored layer ({fingerprint}) in (s3://{self.__bucket}/{self.__key(fingerprint)}).')
+
+    def __key(self, fingerprint: str) -> str:
+        if not self.__prefix:
+            return f'{fingerprint}.tar.gz'
+
+        return f'{self.__prefix}/{fingerprint}.tar.gz'
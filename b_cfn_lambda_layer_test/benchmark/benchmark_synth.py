@@ -0,0 +1,123 @@
+"""
+Import-time and synth-time microbenchmark. Compares eagerly created SSM parameters
+(the default, same as before "lazy_ssm_parameter" existed) with lazily created ones.
+
+Usage:
+    python -m b_cfn_lambda_layer_test.benchmark.benchmark_synth [number_of_layers] [repeats]
+
+Docker builds are not measured: every layer gets the same prebuilt empty asset,
+hence only construct creation and synth are measured and docker is not required.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Tuple, List
+
+from aws_cdk import App, Stack
+
+from b_cfn_lambda_layer.lambda_layer import LambdaLayer
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+
+
+def benchmark_import(statement: str, repeats: int) -> float:
+    """
+    Measures an import statement in fresh interpreters, so that nothing is imported yet.
+
+    :return: Median duration in seconds.
+    """
+    durations = []
+
+    for _ in range(repeats):
+        output = subprocess.run(
+            [
+                sys.executable, '-c',
+                f'import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)'
+            ],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+
+        durations.append(float(output.strip().splitlines()[-1]))
+
+    return statistics.median(durations)
+
+
+def benchmark_synth(number_of_layers: int, lazy_ssm_parameter: bool) -> Tuple[float, float, int, int]:
+    """
+    Creates given number of layers (that are never shared) and synthesizes the app.
+
+    :return: Duration in seconds, peak python memory in MiB, constructs and template resources.
+    """
+    app = App()
+    stack = Stack(app, 'BenchmarkStack')
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    for index in range(number_of_layers):
+        LambdaLayer(scope=stack, name=f'BenchmarkLayer{index}', lazy_ssm_parameter=lazy_ssm_parameter)
+
+    assembly = app.synth()
+
+    elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    resources = assembly.get_stack_by_name('BenchmarkStack').template['Resources']
+
+    return elapsed, peak_memory / 1024 / 1024, len(stack.node.find_all()), len(resources)
+
+
+def main(number_of_layers: int, repeats: int) -> None:
+    print('Import (median of fresh interpreters):')
+
+    imports = [
+        ('lambda_layer_code, eager CDK import', 'import b_cfn_lambda_layer.lambda_layer_code, aws_cdk.aws_lambda'),
+        ('lambda_layer_code', 'import b_cfn_lambda_layer.lambda_layer_code'),
+        ('lambda_layer, eager SSM import', 'import b_cfn_lambda_layer.lambda_layer, aws_cdk.aws_ssm'),
+        ('lambda_layer', 'import b_cfn_lambda_layer.lambda_layer'),
+    ]
+
+    for name, statement in imports:
+        print(f'  {name:<40} {benchmark_import(statement, repeats):.3f}s')
+
+    # Every layer gets the same prebuilt empty asset.
+    asset_path = tempfile.mkdtemp()
+    os.makedirs(os.path.join(asset_path, 'python'))
+    LambdaLayerCode.build_artifact = lambda self: asset_path
+
+    # Warm up the jsii kernel, so that the first measured mode is not penalized.
+    benchmark_synth(10, lazy_ssm_parameter=False)
+
+    print(f'Construct creation and synth of {number_of_layers} layers (median of {repeats}):')
+
+    results: List[Tuple[str, List[Tuple[float, float, int, int]]]] = [('eager SSM', []), ('lazy SSM', [])]
+    for _ in range(repeats):
+        # Modes are interleaved, so that both are equally affected by any drift.
+        for name, runs in results:
+            runs.append(benchmark_synth(number_of_layers, lazy_ssm_parameter=name == 'lazy SSM'))
+
+    medians = {}
+    for name, runs in results:
+        elapsed = statistics.median(run[0] for run in runs)
+        memory = statistics.median(run[1] for run in runs)
+        medians[name] = elapsed
+
+        print(
+            f'  {name:<10} {elapsed:.3f}s, peak python memory {memory:.1f}MiB, '
+            f'{runs[0][2]} constructs, {runs[0][3]} template resources'
+        )
+
+    print(f'  Lazy SSM speedup: {medians["eager SSM"] / medians["lazy SSM"]:.2f}x.')
+
+
+if __name__ == '__main__':
+    main(
+        number_of_layers=int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        repeats=int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    )
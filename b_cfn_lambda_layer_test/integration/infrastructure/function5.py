@@ -0,0 +1,37 @@
+from aws_cdk import Stack
+from aws_cdk.aws_lambda import Function, Code, Runtime
+from b_aws_testing_framework.tools.cdk_testing.testing_stack import TestingStack
+
+from b_cfn_lambda_layer.layers_config import LayersConfig
+from b_cfn_lambda_layer_test.integration.infrastructure.layers_file import root
+
+
+class Function5(Function):
+    """
+    Function that allows us to test whether layers can be declared in a layers file.
+    """
+
+    def __init__(self, scope: Stack):
+        layers = LayersConfig.from_file(f'{root}/layers.yaml').create(
+            scope=scope,
+            name_prefix=TestingStack.global_prefix()
+        )
+
+        super().__init__(
+            scope=scope,
+            id=f'{TestingStack.global_prefix()}TestingFunction5',
+            code=Code.from_inline(
+                'import jose\n'
+                'from layer_source.dummy_module import DummyModule\n'
+                '\n\n'
+                'def handler(*args, **kwargs):\n'
+                '    return dict(\n'
+                '        JoseVersion=jose.__version__,\n'
+                '        Dummy=DummyModule.action()\n'
+                '    )'
+                '\n'
+            ),
+            handler='index.handler',
+            runtime=Runtime.PYTHON_3_10,
+            layers=[layers['TestingLayer5a']]
+        )
@@ -0,0 +1,3 @@
+from os.path import dirname, abspath
+
+root = dirname(abspath(__file__))
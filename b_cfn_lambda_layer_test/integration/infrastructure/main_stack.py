@@ -6,6 +6,7 @@ from b_cfn_lambda_layer_test.integration.infrastructure.function1 import Functio
 from b_cfn_lambda_layer_test.integration.infrastructure.function2 import Function2
 from b_cfn_lambda_layer_test.integration.infrastructure.function3 import Function3
 from b_cfn_lambda_layer_test.integration.infrastructure.function4 import Function4
+from b_cfn_lambda_layer_test.integration.infrastructure.function5 import Function5
 
 
 class MainStack(TestingStack):
@@ -14,6 +15,7 @@ class MainStack(TestingStack):
     LAMBDA_FUNCTION_3_NAME_KEY = 'LambdaFunction3Name'
     LAMBDA_FUNCTION_4_NAME_KEY = 'LambdaFunction4Name'
     LAMBDA_FUNCTION_5_NAME_KEY = 'LambdaFunction5Name'
+    LAMBDA_FUNCTION_6_NAME_KEY = 'LambdaFunction6Name'
 
     def __init__(self, scope: Construct):
         super().__init__(scope=scope)
@@ -22,6 +24,7 @@ class MainStack(TestingStack):
         self.function2 = Function2(self)
         self.function3 = Function3(self)
         self.function4 = Function4(self)
+        self.function5 = Function5(self)
 
         cross_stack = CrossStackLayers(self)
 
@@ -30,3 +33,4 @@ class MainStack(TestingStack):
         self.add_output(self.LAMBDA_FUNCTION_3_NAME_KEY, value=self.function3.function_name)
         self.add_output(self.LAMBDA_FUNCTION_4_NAME_KEY, value=cross_stack.function1.function_name)
         self.add_output(self.LAMBDA_FUNCTION_5_NAME_KEY, value=self.function4.function_name)
+        self.add_output(self.LAMBDA_FUNCTION_6_NAME_KEY, value=self.function5.function_name)
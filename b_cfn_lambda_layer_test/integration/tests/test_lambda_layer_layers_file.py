@@ -0,0 +1,31 @@
+import json
+
+from b_aws_testing_framework.credentials import Credentials
+from botocore.response import StreamingBody
+
+from b_cfn_lambda_layer_test.integration.infrastructure.main_stack import MainStack
+
+
+def test_RESOURCE_lambda_layer_WITH_layers_file_EXPECT_execution_successful():
+    """
+    Test whether layers declared in a layers file provide necessary functionality.
+
+    :return: No return.
+    """
+    # Create client for lambda service.
+    lambda_client = Credentials().boto_session.client('lambda')
+
+    # Invoke specific lambda function.
+    response = lambda_client.invoke(
+        FunctionName=MainStack.get_output(MainStack.LAMBDA_FUNCTION_6_NAME_KEY),
+        InvocationType='RequestResponse'
+    )
+
+    # Parse the result.
+    payload: StreamingBody = response['Payload']
+    data = [item.decode() for item in payload.iter_lines()]
+    data = json.loads(''.join(data))
+
+    # Assert that the result is as expected.
+    assert data.get('JoseVersion') == '3.3.0', data
+    assert data.get('Dummy') == 'Hello world from dummy module!', data
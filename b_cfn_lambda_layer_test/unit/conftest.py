@@ -0,0 +1,25 @@
+import pytest
+
+from b_cfn_lambda_layer import lambda_layer_code
+from b_cfn_lambda_layer.docker_image_resolver import DockerImageResolver
+from b_cfn_lambda_layer.file_digest_cache import FileDigestCache
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+
+
+@pytest.fixture
+def build_root(tmp_path, monkeypatch):
+    """
+    Redirects all build caches and artifacts to a temporary directory,
+    so that unit tests never touch (or depend on) the real build directory.
+
+    :return: Path to the temporary build root.
+    """
+    monkeypatch.setattr(lambda_layer_code, 'docker_build_root', str(tmp_path))
+    monkeypatch.setattr(LambdaLayerCode, 'ARTIFACTS_ROOT', str(tmp_path / '.artifacts'))
+    monkeypatch.setattr(FileDigestCache, 'CACHE_FILE', str(tmp_path / '.file_digests.json'))
+    monkeypatch.setattr(FileDigestCache, '_FileDigestCache__digests', None)
+    monkeypatch.setattr(DockerImageResolver, 'CACHE_FILE', str(tmp_path / '.docker_image_digests.json'))
+    monkeypatch.setattr(DockerImageResolver, '_DockerImageResolver__resolved', {})
+    monkeypatch.delenv('B_CFN_LAMBDA_LAYER_ARTIFACT_STORE', raising=False)
+
+    return tmp_path
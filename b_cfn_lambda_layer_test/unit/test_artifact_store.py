@@ -0,0 +1,114 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+from b_cfn_lambda_layer.artifact_store import ArtifactStore
+from b_cfn_lambda_layer.local_artifact_store import LocalArtifactStore
+
+
+def create_layer(path) -> None:
+    (path / 'python' / 'package').mkdir(parents=True)
+    (path / 'python' / 'package' / '__init__.py').write_text('VALUE = 1\n')
+    (path / 'python' / 'package' / 'data.bin').write_bytes(bytes(range(256)))
+    os.symlink('package/__init__.py', path / 'python' / 'alias.py')
+
+
+def archive(*members: tarfile.TarInfo) -> io.BytesIO:
+    fileobj = io.BytesIO()
+
+    with tarfile.open(fileobj=fileobj, mode='w:gz') as tar:
+        for member in members:
+            tar.addfile(member, io.BytesIO(b'x' * member.size) if member.isfile() else None)
+
+    fileobj.seek(0)
+    return fileobj
+
+
+def test_FUNCTION_pack_unpack_WITH_layer_directory_EXPECT_same_contents(tmp_path):
+    """
+    Test whether a packed layer is unpacked with the same files, contents and symlinks.
+
+    :return: No return.
+    """
+    create_layer(tmp_path / 'source')
+
+    fileobj = io.BytesIO()
+    ArtifactStore.pack(str(tmp_path / 'source'), fileobj)
+    fileobj.seek(0)
+    ArtifactStore.unpack(fileobj, str(tmp_path / 'destination'))
+
+    destination = tmp_path / 'destination' / 'python'
+    assert (destination / 'package' / '__init__.py').read_text() == 'VALUE = 1\n'
+    assert (destination / 'package' / 'data.bin').read_bytes() == bytes(range(256))
+    assert os.readlink(destination / 'alias.py') == 'package/__init__.py'
+
+
+def test_FUNCTION_unpack_WITH_path_traversal_member_EXPECT_error(tmp_path):
+    """
+    Test whether archive members pointing outside of the destination are rejected.
+
+    :return: No return.
+    """
+    member = tarfile.TarInfo('../escaped.py')
+    member.size = 1
+
+    with pytest.raises(ValueError, match='outside of the destination'):
+        ArtifactStore.unpack(archive(member), str(tmp_path / 'destination'))
+
+    assert not (tmp_path / 'escaped.py').exists()
+
+
+def test_FUNCTION_unpack_WITH_symlink_outside_EXPECT_error(tmp_path):
+    """
+    Test whether symlinks pointing outside of the destination are rejected.
+
+    :return: No return.
+    """
+    member = tarfile.TarInfo('python/passwd')
+    member.type = tarfile.SYMTYPE
+    member.linkname = '../../../etc/passwd'
+
+    with pytest.raises(ValueError, match='links outside of the destination'):
+        ArtifactStore.unpack(archive(member), str(tmp_path / 'destination'))
+
+
+def test_FUNCTION_unpack_WITH_device_member_EXPECT_error(tmp_path):
+    """
+    Test whether special archive members (e.g. devices) are rejected.
+
+    :return: No return.
+    """
+    member = tarfile.TarInfo('python/device')
+    member.type = tarfile.CHRTYPE
+
+    with pytest.raises(ValueError, match='unsupported type'):
+        ArtifactStore.unpack(archive(member), str(tmp_path / 'destination'))
+
+
+def test_RESOURCE_local_artifact_store_WITH_stored_layer_EXPECT_restored(tmp_path):
+    """
+    Test whether a layer stored in a local store is restored, and a missing one is not.
+
+    :return: No return.
+    """
+    create_layer(tmp_path / 'source')
+    store = LocalArtifactStore(str(tmp_path / 'store'))
+
+    assert store.fetch('abc', str(tmp_path / 'missing')) is False
+
+    store.store('abc', str(tmp_path / 'source'))
+    assert os.listdir(tmp_path / 'store') == ['abc.tar.gz']
+
+    assert store.fetch('abc', str(tmp_path / 'destination')) is True
+    assert (tmp_path / 'destination' / 'python' / 'package' / '__init__.py').read_text() == 'VALUE = 1\n'
+
+
+def test_FUNCTION_from_uri_WITH_directory_EXPECT_local_store(tmp_path):
+    """
+    Test whether a directory URI creates a local store.
+
+    :return: No return.
+    """
+    assert isinstance(ArtifactStore.from_uri(str(tmp_path)), LocalArtifactStore)
@@ -0,0 +1,218 @@
+from typing import List
+
+import pytest
+
+from b_cfn_lambda_layer.build_log import BuildLogParser, BuildEvent
+
+BUILDKIT_OUTPUT = """
+#0 building with "default" instance using docker driver
+#1 [internal] load build definition from Dockerfile
+#1 transferring dockerfile: 1.10kB done
+#1 DONE 0.0s
+#5 [2/9] RUN mkdir -p /asset/python
+#5 CACHED
+#6 [3/9] RUN eval $PIP_INSTALL
+#6 0.512 Collecting python-jose==3.3.0
+#6 0.987   Downloading python_jose-3.3.0-py2.py3-none-any.whl (33 kB)
+#6 1.250 Collecting rsa
+#6 1.300   Downloading rsa-4.9-py3-none-any.whl (34 kB)
+#6 1.500 Collecting ecdsa
+#6 1.600   Downloading ecdsa-0.18.0.tar.gz (197 kB)
+#6 1.700   Preparing metadata (setup.py): started
+#6 1.900   Preparing metadata (setup.py): finished with status 'done'
+#6 2.000 Building wheels for collected packages: ecdsa
+#6 2.100   Building wheel for ecdsa (setup.py): started
+#6 4.600   Building wheel for ecdsa (setup.py): finished with status 'done'
+#6 4.610   Created wheel for ecdsa: filename=ecdsa-0.18.0-py2.py3-none-any.whl size=142915
+#6 4.620   Stored in directory: /root/.cache/pip/wheels/ab/cd/ef
+#6 4.630 Successfully built ecdsa
+#6 4.700 Installing collected packages: rsa, ecdsa, python-jose
+#6 5.000 Successfully installed ecdsa-0.18.0 python-jose-3.3.0 rsa-4.9
+#6 DONE 5.1s
+#7 [4/9] RUN ls -la $OUTPUTS_PATH
+#7 0.210 total 0
+#7 ERROR: process "/bin/sh -c ls -la $OUTPUTS_PATH" did not complete successfully: exit code: 2
+"""
+
+LEGACY_OUTPUT = """
+Sending build context to Docker daemon  3.072kB
+Step 1/9 : FROM python:3.9
+ ---> 0a1b2c3d4e5f
+Step 2/9 : RUN mkdir -p /asset/python
+ ---> Using cache
+ ---> 1a2b3c4d5e6f
+Step 3/9 : RUN eval $PIP_INSTALL
+ ---> Running in 2b3c4d5e6f7a
+Collecting python-jose==3.3.0
+  Downloading python_jose-3.3.0-py2.py3-none-any.whl (33 kB)
+Collecting rsa
+  Downloading rsa-4.9-py3-none-any.whl (34 kB)
+Building wheels for collected packages: rsa
+  Building wheel for rsa (pyproject.toml): started
+  Building wheel for rsa (pyproject.toml): finished with status 'done'
+Successfully built rsa
+Installing collected packages: rsa, python-jose
+Successfully installed python-jose-3.3.0 rsa-4.9
+Removing intermediate container 2b3c4d5e6f7a
+ ---> 3c4d5e6f7a8b
+Successfully built 3c4d5e6f7a8b
+Successfully tagged b-cfn-lambda-layer:latest
+"""
+
+
+def parse(output: str, failed: bool = False) -> List[BuildEvent]:
+    events = []
+    parser = BuildLogParser(layer_name='Layer', on_event=events.append)
+
+    for line in output.strip().splitlines():
+        parser.feed(line)
+
+    parser.close(failed=failed)
+    return events
+
+
+def summary(events: List[BuildEvent]) -> List[tuple]:
+    return [(event.step, event.package, event.status) for event in events]
+
+
+def test_FUNCTION_feed_WITH_buildkit_output_EXPECT_steps_and_packages():
+    """
+    Test whether BuildKit "plain" progress output is parsed into step and package events.
+
+    :return: No return.
+    """
+    events = parse(BUILDKIT_OUTPUT)
+
+    assert summary(events) == [
+        ('load build definition from Dockerfile', None, BuildEvent.Status.DONE),
+        ('RUN mkdir -p /asset/python', None, BuildEvent.Status.CACHED),
+        ('RUN eval $PIP_INSTALL', 'python-jose', BuildEvent.Status.DONE),
+        ('RUN eval $PIP_INSTALL', 'rsa', BuildEvent.Status.DONE),
+        ('RUN eval $PIP_INSTALL', 'ecdsa', BuildEvent.Status.DONE),
+        ('RUN eval $PIP_INSTALL', 'ecdsa', BuildEvent.Status.DONE),
+        ('RUN eval $PIP_INSTALL', None, BuildEvent.Status.DONE),
+        ('RUN ls -la $OUTPUTS_PATH', None, BuildEvent.Status.ERROR),
+    ]
+    assert all(event.layer_name == 'Layer' for event in events)
+
+
+def test_FUNCTION_feed_WITH_buildkit_timestamps_EXPECT_durations_from_output():
+    """
+    Test whether BuildKit step durations and in-step timestamps are used for durations.
+
+    :return: No return.
+    """
+    durations = [(event.package, event.duration) for event in parse(BUILDKIT_OUTPUT)]
+
+    assert durations[2:6] == [
+        ('python-jose', pytest.approx(1.25 - 0.512)),
+        ('rsa', pytest.approx(1.5 - 1.25)),
+        # Download and metadata preparation, then the wheel build.
+        ('ecdsa', pytest.approx(2.0 - 1.5)),
+        ('ecdsa', pytest.approx(4.6 - 2.1)),
+    ]
+    assert durations[6] == (None, pytest.approx(5.1))
+
+
+def test_FUNCTION_feed_WITH_indented_wheel_build_EXPECT_build_charged_to_built_package():
+    """
+    Test whether a slow wheel build (reported by pip with indented lines) is charged
+    to the package being built, not to the package that was collected last.
+
+    :return: No return.
+    """
+    events = parse(
+        '#7 [3/9] RUN eval $PIP_INSTALL\n'
+        '#7 0.500 Collecting cffi==1.16.0\n'
+        '#7 0.600   Downloading cffi-1.16.0.tar.gz (512 kB)\n'
+        '#7 1.000 Collecting pycparser\n'
+        '#7 1.100   Downloading pycparser-2.21-py2.py3-none-any.whl (118 kB)\n'
+        '#7 2.000 Building wheels for collected packages: cffi\n'
+        '#7 2.100   Building wheel for cffi (pyproject.toml): started\n'
+        "#7 30.000   Building wheel for cffi (pyproject.toml): finished with status 'done'\n"
+        '#7 30.100 Successfully built cffi\n'
+        '#7 30.200 Installing collected packages: pycparser, cffi\n'
+        '#7 DONE 31.0s\n'
+    )
+
+    assert [(event.package, event.duration) for event in events] == [
+        ('cffi', pytest.approx(0.5)),
+        ('pycparser', pytest.approx(1.0)),
+        ('cffi', pytest.approx(27.9)),
+        (None, pytest.approx(31.0)),
+    ]
+
+
+def test_FUNCTION_feed_WITH_repeated_buildkit_header_EXPECT_single_step():
+    """
+    Test whether interleaved BuildKit outputs (that repeat step headers) do not restart a step.
+
+    :return: No return.
+    """
+    events = parse(
+        '#6 [3/9] RUN eval $PIP_INSTALL\n'
+        '#6 0.500 Collecting rsa\n'
+        '#7 [internal] load metadata for docker.io/library/python:3.9\n'
+        '#6 [3/9] RUN eval $PIP_INSTALL\n'
+        '#6 1.500 Collecting six\n'
+        '#7 DONE 0.3s\n'
+        '#6 DONE 2.0s\n'
+    )
+
+    assert summary(events) == [
+        ('RUN eval $PIP_INSTALL', 'rsa', BuildEvent.Status.DONE),
+        ('load metadata for docker.io/library/python:3.9', None, BuildEvent.Status.DONE),
+        ('RUN eval $PIP_INSTALL', 'six', BuildEvent.Status.DONE),
+        ('RUN eval $PIP_INSTALL', None, BuildEvent.Status.DONE),
+    ]
+    assert events[-1].duration == pytest.approx(2.0)
+
+
+def test_FUNCTION_feed_WITH_legacy_output_EXPECT_steps_and_packages():
+    """
+    Test whether legacy builder output is parsed into step and package events.
+
+    :return: No return.
+    """
+    assert summary(parse(LEGACY_OUTPUT)) == [
+        ('FROM python:3.9', None, BuildEvent.Status.DONE),
+        ('RUN mkdir -p /asset/python', None, BuildEvent.Status.CACHED),
+        ('RUN eval $PIP_INSTALL', 'python-jose', BuildEvent.Status.DONE),
+        ('RUN eval $PIP_INSTALL', 'rsa', BuildEvent.Status.DONE),
+        ('RUN eval $PIP_INSTALL', 'rsa', BuildEvent.Status.DONE),
+        ('RUN eval $PIP_INSTALL', None, BuildEvent.Status.DONE),
+    ]
+
+
+def test_FUNCTION_close_WITH_failed_build_EXPECT_unfinished_steps_failed():
+    """
+    Test whether steps that never finished are reported as failed when the build fails.
+
+    :return: No return.
+    """
+    output = (
+        'Step 1/2 : RUN eval $PIP_INSTALL\n'
+        'Collecting rsa\n'
+        "ERROR: Could not find a version that satisfies the requirement rsa==0.0.0\n"
+    )
+
+    assert summary(parse(output, failed=True)) == [
+        ('RUN eval $PIP_INSTALL', 'rsa', BuildEvent.Status.ERROR),
+        ('RUN eval $PIP_INSTALL', None, BuildEvent.Status.ERROR),
+    ]
+
+
+def test_FUNCTION_log_event_WITH_no_callback_EXPECT_events_logged(caplog):
+    """
+    Test whether events are logged if no callback is given.
+
+    :return: No return.
+    """
+    parser = BuildLogParser(layer_name='Layer')
+
+    with caplog.at_level('INFO', logger='b_cfn_lambda_layer.build_log'):
+        parser.feed('#5 [2/9] RUN mkdir -p /asset/python')
+        parser.feed('#5 CACHED')
+
+    assert [record.build_event.status for record in caplog.records] == [BuildEvent.Status.CACHED]
+    assert '[Layer] RUN mkdir -p /asset/python: CACHED' in caplog.text
@@ -0,0 +1,70 @@
+import re
+import threading
+
+from b_cfn_lambda_layer import root
+from b_cfn_lambda_layer.build_plan import BuildPlan
+from b_cfn_lambda_layer.dependency import Dependency
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+from b_cfn_lambda_layer.package_version import PackageVersion
+
+
+def test_FUNCTION_execute_WITH_shared_installation_EXPECT_one_warm_up_build_per_installation(
+        build_root,
+        tmp_path,
+        monkeypatch
+):
+    """
+    Test whether codes that share a docker image and an installation command (but differ by
+    source code, including source directory names) are built once in the warm-up wave,
+    and the rest of them only after it, while distinct installations are warmed up in parallel.
+
+    :return: No return.
+    """
+    for name in ('first', 'second', 'third'):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'module.py').write_text(f'NAME = "{name}"\n')
+
+    def code(source: str, dependency: str) -> LambdaLayerCode:
+        return LambdaLayerCode(
+            source_path=str(tmp_path / source),
+            dependencies=[Dependency(dependency, PackageVersion.from_string_version('1.0'))],
+            pin_docker_image=False,
+            name=source
+        )
+
+    codes = [code('first', 'foo'), code('second', 'foo'), code('third', 'bar'), code('first', 'foo')]
+
+    waves = []
+    lock = threading.Lock()
+
+    def build_artifact(self) -> str:
+        with lock:
+            waves.append(self.name)
+
+        return str(build_root / self.fingerprint())
+
+    monkeypatch.setattr(LambdaLayerCode, 'build_artifact', build_artifact)
+
+    artifacts = BuildPlan(codes=codes).execute()
+
+    # Identical codes are built once, one code per installation warms up the cache.
+    assert len(artifacts) == 3
+    assert sorted(waves) == ['first', 'second', 'third']
+    # "third" has its own installation, hence it never waits for the warm-up wave.
+    assert waves[2] != 'third'
+
+
+def test_RESOURCE_dockerfile_WITH_source_path_argument_EXPECT_declared_after_installation():
+    """
+    Test whether the source code path argument (that differs for every source directory name)
+    is declared only after the dependencies installation step. Every declared build argument
+    is a part of the docker cache key, hence otherwise installations would never be shared.
+
+    :return: No return.
+    """
+    with open(f'{root}/Dockerfile') as file:
+        dockerfile = file.read()
+
+    assert re.search(r'^RUN eval \$PIP_INSTALL$', dockerfile, re.MULTILINE)
+    assert dockerfile.index('RUN eval $PIP_INSTALL') < dockerfile.index('ARG INPUTS_PATH')
+    assert dockerfile.index('ARG INPUTS_PATH') < dockerfile.index('COPY $INPUTS_PATH')
@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+import time
+
+from b_cfn_lambda_layer import lambda_layer_code
+from b_cfn_lambda_layer.file_digest_cache import FileDigestCache
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+
+
+def build_in_process(build_root: str, source_path: str, barrier, results) -> None:
+    """
+    Builds a layer in a separate process, as a parallel synth would. The build itself
+    is stubbed: it records itself and takes a while, so that the other process has to wait.
+    """
+    lambda_layer_code.docker_build_root = build_root
+    LambdaLayerCode.ARTIFACTS_ROOT = os.path.join(build_root, '.artifacts')
+    FileDigestCache.CACHE_FILE = os.path.join(build_root, '.file_digests.json')
+
+    def build(self, fingerprint: str, output_path: str) -> None:
+        with open(os.path.join(build_root, 'builds.log'), 'a') as file:
+            file.write(f'{os.getpid()}\n')
+
+        time.sleep(1)
+        os.makedirs(os.path.join(output_path, 'python'))
+
+        with open(os.path.join(output_path, 'python', 'built_by.txt'), 'w') as file:
+            file.write(str(os.getpid()))
+
+    LambdaLayerCode._LambdaLayerCode__build = build
+
+    code = LambdaLayerCode(source_path=source_path, pin_docker_image=False)
+    code.fingerprint()
+
+    barrier.wait()
+    results.put(code.build_artifact())
+
+
+def test_FUNCTION_build_artifact_WITH_concurrent_processes_EXPECT_single_build(tmp_path):
+    """
+    Test whether processes building the same fingerprint at the same time build it only
+    once, all get the same published artifact and no lock file is left behind.
+
+    :return: No return.
+    """
+    (tmp_path / 'source').mkdir()
+    (tmp_path / 'source' / 'module.py').write_text('VALUE = 1\n')
+    (tmp_path / 'root').mkdir()
+
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(3)
+    results = context.Queue()
+
+    processes = [
+        context.Process(target=build_in_process, args=(str(tmp_path / 'root'), str(tmp_path / 'source'), barrier, results))
+        for _ in range(3)
+    ]
+
+    for process in processes:
+        process.start()
+
+    artifacts = [results.get(timeout=60) for _ in processes]
+
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    builds = (tmp_path / 'root' / 'builds.log').read_text().split()
+
+    assert len(builds) == 1
+    assert len(set(artifacts)) == 1
+    assert open(os.path.join(artifacts[0], 'python', 'built_by.txt')).read() == builds[0]
+    assert sorted(os.listdir(tmp_path / 'root' / '.artifacts')) == [os.path.basename(artifacts[0])]
@@ -0,0 +1,176 @@
+import json
+import subprocess
+import sys
+from typing import List
+
+import pytest
+
+from b_cfn_lambda_layer import dependency_classifier
+from b_cfn_lambda_layer.dependency import Dependency
+from b_cfn_lambda_layer.dependency_classifier import DependencyClassifier
+from b_cfn_lambda_layer.package_version import PackageVersion
+
+HOST_PYTHON_VERSION = f'{sys.version_info.major}.{sys.version_info.minor}'
+
+# A resolution where "cryptography" and "python-jose" share a transitive dependency ("six"),
+# "pycrypto" ships only a source distribution and "orjson" only a wheel for a newer glibc.
+REPORT = {
+    'version': '1',
+    'install': [
+        {
+            'metadata': {'name': name, 'version': version},
+            'download_info': {'url': f'https://files.example.com/packages/{wheel}'}
+        }
+        for name, version, wheel in [
+            ('python-jose', '3.3.0', 'python_jose-3.3.0-py2.py3-none-any.whl'),
+            ('cryptography', '41.0.7', 'cryptography-41.0.7-cp37-abi3-manylinux2014_x86_64.whl'),
+            ('cffi', '1.16.0', 'cffi-1.16.0-cp311-cp311-manylinux2014_x86_64.whl'),
+            ('six', '1.16.0', 'six-1.16.0-py2.py3-none-any.whl'),
+            ('pycrypto', '2.6.1', 'pycrypto-2.6.1.tar.gz'),
+            ('orjson', '3.9.10', 'orjson-3.9.10-cp311-cp311-manylinux_2_28_x86_64.whl'),
+        ]
+    ]
+}
+
+
+@pytest.fixture
+def pip_calls(monkeypatch) -> List[List[str]]:
+    """
+    Replaces subprocess.run with a pip that writes a fixed resolution report.
+    """
+    calls = []
+
+    def run(args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        calls.append(args)
+
+        with open(args[args.index('--report') + 1], 'w') as file:
+            json.dump(REPORT, file)
+
+        return subprocess.CompletedProcess(args, 0, stdout='', stderr='')
+
+    monkeypatch.setattr(dependency_classifier.subprocess, 'run', run)
+    monkeypatch.setattr(dependency_classifier.sys, 'platform', 'linux')
+    monkeypatch.setattr(dependency_classifier.host_platform, 'machine', lambda: 'x86_64')
+
+    return calls
+
+
+def test_FUNCTION_split_WITH_shared_transitive_dependency_EXPECT_single_pinned_closure(pip_calls):
+    """
+    Test whether dependencies are resolved once and the whole pinned closure is split,
+    so that a shared transitive dependency belongs to exactly one side. Distributions with
+    target platform wheels (universal or manylinux ones) are installable on the host.
+
+    :return: No return.
+    """
+    wheels, builds = DependencyClassifier(HOST_PYTHON_VERSION, additional_pip_install_args='--pre').split([
+        Dependency('python-jose', PackageVersion.from_string_version('3.3.0')),
+        Dependency('cryptography', PackageVersion.latest()),
+        Dependency('pycrypto', PackageVersion.latest()),
+        Dependency('orjson', PackageVersion.latest()),
+        Dependency('boto3', PackageVersion.dont_install()),
+    ])
+
+    assert [dependency.build_string() for dependency in wheels] == [
+        'python-jose==3.3.0',
+        'cryptography==41.0.7',
+        'cffi==1.16.0',
+        'six==1.16.0'
+    ]
+    assert [dependency.build_string() for dependency in builds] == ['pycrypto==2.6.1', 'orjson==3.9.10']
+
+    assert len(pip_calls) == 1
+    command = pip_calls[0]
+    assert command[0] == sys.executable
+    assert command[3:8] == ['install', 'python-jose==3.3.0', 'cryptography', 'pycrypto', 'orjson']
+    assert '--dry-run' in command and '--prefer-binary' in command and '--pre' in command
+    assert '--only-binary=:all:' not in command and '--platform' not in command
+
+
+@pytest.mark.parametrize('file_name, installable', [
+    ('six-1.16.0-py2.py3-none-any.whl', True),
+    ('cffi-1.16.0-cp311-cp311-manylinux1_x86_64.whl', True),
+    ('cffi-1.16.0-cp311-cp311-manylinux_2_17_x86_64.manylinux2014_x86_64.whl', True),
+    ('orjson-3.9.10-cp311-cp311-manylinux_2_28_x86_64.whl', False),
+    ('cffi-1.16.0-cp311-cp311-manylinux2014_aarch64.whl', False),
+    ('cffi-1.16.0-cp311-cp311-musllinux_1_1_x86_64.whl', False),
+    ('pycrypto-2.6.1.tar.gz', False),
+])
+def test_FUNCTION_split_WITH_distribution_file_EXPECT_target_platform_wheels_installable(
+        file_name,
+        installable,
+        monkeypatch
+):
+    """
+    Test whether only wheels supporting the target platform (manylinux2014_x86_64) are
+    installed on the host, while source distributions and other wheels are built.
+
+    :return: No return.
+    """
+    monkeypatch.setattr(
+        DependencyClassifier,
+        '_DependencyClassifier__resolve',
+        lambda self, dependencies: [('dummy', '1.0.0', file_name)]
+    )
+
+    wheels, builds = DependencyClassifier(HOST_PYTHON_VERSION).split([Dependency('dummy')])
+
+    assert (len(wheels), len(builds)) == ((1, 0) if installable else (0, 1))
+
+
+def test_FUNCTION_split_WITH_no_dependencies_EXPECT_no_resolution(pip_calls):
+    """
+    Test whether pip is not called at all if there is nothing to install.
+
+    :return: No return.
+    """
+    assert DependencyClassifier(HOST_PYTHON_VERSION).split([]) == ([], [])
+    assert pip_calls == []
+
+
+def test_FUNCTION_split_WITH_foreign_python_version_EXPECT_matching_interpreter(pip_calls, monkeypatch):
+    """
+    Test whether the resolution runs on an interpreter of the target python version,
+    since pip evaluates environment markers against the interpreter it runs on.
+
+    :return: No return.
+    """
+    monkeypatch.setattr(dependency_classifier.shutil, 'which', lambda name: f'/usr/bin/{name}')
+    DependencyClassifier('2.7').split([Dependency('six')])
+    assert pip_calls[0][0] == '/usr/bin/python2.7'
+
+    monkeypatch.setattr(dependency_classifier.shutil, 'which', lambda name: None)
+    with pytest.raises(RuntimeError, match='interpreter is not available'):
+        DependencyClassifier('2.7').split([Dependency('six')])
+
+
+def test_FUNCTION_split_WITH_foreign_architecture_EXPECT_error(pip_calls, monkeypatch):
+    """
+    Test whether the resolution is refused on a host whose markers do not match the target platform.
+
+    :return: No return.
+    """
+    monkeypatch.setattr(dependency_classifier.host_platform, 'machine', lambda: 'aarch64')
+
+    with pytest.raises(RuntimeError, match='can not be resolved on this host'):
+        DependencyClassifier(HOST_PYTHON_VERSION).split([Dependency('six')])
+
+    assert pip_calls == []
+
+
+def test_FUNCTION_split_WITH_failed_resolution_EXPECT_error(monkeypatch):
+    """
+    Test whether a failed resolution (e.g. a dependency that does not exist) raises an error.
+
+    :return: No return.
+    """
+    monkeypatch.setattr(dependency_classifier.sys, 'platform', 'linux')
+    monkeypatch.setattr(dependency_classifier.host_platform, 'machine', lambda: 'x86_64')
+    monkeypatch.setattr(
+        dependency_classifier.subprocess,
+        'run',
+        lambda args, **kwargs: subprocess.CompletedProcess(args, 1, stdout='', stderr='No matching distribution')
+    )
+
+    with pytest.raises(RuntimeError, match='No matching distribution'):
+        DependencyClassifier(HOST_PYTHON_VERSION).split([Dependency('missing')])
@@ -0,0 +1,95 @@
+import subprocess
+from typing import List
+
+import pytest
+
+from b_cfn_lambda_layer import docker_build
+from b_cfn_lambda_layer.docker_build import DockerBuild
+
+
+class FakeDocker:
+    """
+    Replaces subprocess.Popen (used by "docker build") and subprocess.run (other commands).
+    """
+    def __init__(self, build_exit_code: int = 0) -> None:
+        self.build_exit_code = build_exit_code
+        self.commands: List[List[str]] = []
+
+    def popen(self, args: List[str], **kwargs):
+        fake = self
+        fake.commands.append(args[1:])
+
+        class Process:
+            returncode = fake.build_exit_code
+            stdout = iter(['#1 [1/2] FROM python:3.9\n', '#1 DONE 0.1s\n'])
+
+            def __enter__(self):
+                with open(args[args.index('--iidfile') + 1], 'w') as file:
+                    file.write('sha256:image')
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+        return Process()
+
+    def run(self, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        self.commands.append(args[1:])
+        stdout = 'container\n' if args[1] == 'create' else ''
+        return subprocess.CompletedProcess(args, 0, stdout=stdout, stderr='')
+
+
+@pytest.fixture
+def docker(monkeypatch) -> FakeDocker:
+    fake = FakeDocker()
+    monkeypatch.setattr(docker_build.subprocess, 'Popen', fake.popen)
+    monkeypatch.setattr(docker_build.subprocess, 'run', fake.run)
+    return fake
+
+
+def test_FUNCTION_build_WITH_no_tag_EXPECT_image_used_by_id_and_removed(docker, tmp_path):
+    """
+    Test whether an untagged image is used by its id and removed once outputs are copied,
+    so that per-build images do not pile up.
+
+    :return: No return.
+    """
+    lines = []
+    DockerBuild(str(tmp_path), '/Dockerfile', {'DOCKER_IMAGE': 'python:3.9'}).build(
+        output_path=str(tmp_path / 'output'),
+        on_output=lines.append
+    )
+
+    assert [command[0] for command in docker.commands] == ['build', 'create', 'cp', 'rm', 'rmi']
+    assert '--tag' not in docker.commands[0]
+    assert docker.commands[0][-3:] == ['--build-arg', 'DOCKER_IMAGE=python:3.9', str(tmp_path)]
+    assert docker.commands[1] == ['create', 'sha256:image']
+    assert docker.commands[2] == ['cp', 'container:/asset', str(tmp_path / 'output')]
+    assert docker.commands[4] == ['rmi', '--no-prune', 'sha256:image']
+    assert lines == ['#1 [1/2] FROM python:3.9', '#1 DONE 0.1s']
+
+
+def test_FUNCTION_build_WITH_tag_EXPECT_image_kept(docker, tmp_path):
+    """
+    Test whether an explicitly tagged image is kept.
+
+    :return: No return.
+    """
+    DockerBuild(str(tmp_path), '/Dockerfile', image_tag='layer:latest').build(output_path=str(tmp_path / 'output'))
+
+    assert [command[0] for command in docker.commands] == ['build', 'create', 'cp', 'rm']
+    assert docker.commands[0][docker.commands[0].index('--tag') + 1] == 'layer:latest'
+
+
+def test_FUNCTION_build_WITH_failed_build_EXPECT_error_with_output(docker, tmp_path):
+    """
+    Test whether a failed build raises an error containing the build output.
+
+    :return: No return.
+    """
+    docker.build_exit_code = 1
+
+    with pytest.raises(RuntimeError, match='#1 DONE 0.1s'):
+        DockerBuild(str(tmp_path), '/Dockerfile').build(output_path=str(tmp_path / 'output'))
+
+    assert [command[0] for command in docker.commands] == ['build']
@@ -0,0 +1,241 @@
+import io
+import json
+import subprocess
+from typing import List, Optional
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+from b_cfn_lambda_layer import docker_image_resolver
+from b_cfn_lambda_layer.docker_image_resolver import DockerImageResolver
+
+DIGEST = 'python@sha256:' + 'a' * 64
+FRESH_DIGEST = 'python@sha256:' + 'b' * 64
+
+
+class FakeDocker:
+    """
+    Replaces subprocess.run with a docker CLI that knows a given set of local images
+    and a registry that serves a given manifest digest.
+    """
+    def __init__(
+            self,
+            local_images: List[str],
+            repo_digests: Optional[List[str]] = None,
+            registry_digest: Optional[str] = None
+    ) -> None:
+        self.local_images = set(local_images)
+        self.repo_digests = repo_digests or []
+        self.registry_digest = registry_digest
+        self.calls: List[List[str]] = []
+
+    def run(self, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        self.calls.append(args[1:])
+        command = args[1:]
+
+        if command[:3] == ['buildx', 'imagetools', 'inspect']:
+            if not self.registry_digest:
+                return subprocess.CompletedProcess(args, 1, stdout='', stderr='not found')
+
+            manifest = {'mediaType': 'application/vnd.oci.image.index.v1+json', 'digest': self.registry_digest}
+            return subprocess.CompletedProcess(args, 0, stdout=json.dumps(manifest), stderr='')
+
+        if command[:2] == ['image', 'inspect']:
+            image = command[-1]
+            if image not in self.local_images:
+                return subprocess.CompletedProcess(args, 1, stdout='', stderr='No such image')
+
+            if '{{.Id}}' in command:
+                return subprocess.CompletedProcess(args, 0, stdout='sha256:id\n', stderr='')
+
+            return subprocess.CompletedProcess(args, 0, stdout=json.dumps(self.repo_digests), stderr='')
+
+        raise AssertionError(f'Unexpected docker command: {command}.')
+
+    @property
+    def pulls(self) -> List[List[str]]:
+        return [call for call in self.calls if call[0] == 'pull']
+
+
+@pytest.fixture(autouse=True)
+def no_registry(monkeypatch) -> None:
+    """
+    Unit tests never reach a real registry.
+    """
+    def urlopen(request, timeout=None):
+        raise URLError('Registry is not available.')
+
+    monkeypatch.setattr(docker_image_resolver, 'urlopen', urlopen)
+
+
+def test_FUNCTION_resolve_WITH_cached_digest_present_locally_EXPECT_no_pull(build_root, monkeypatch):
+    """
+    Test whether a cached digest that is still present locally is reused without pulling.
+
+    :return: No return.
+    """
+    (build_root / '.docker_image_digests.json').write_text(json.dumps({'python:3.9': DIGEST}))
+
+    docker = FakeDocker(local_images=[DIGEST], registry_digest=FRESH_DIGEST[len('python@'):])
+    monkeypatch.setattr(docker_image_resolver.subprocess, 'run', docker.run)
+
+    assert DockerImageResolver.resolve('python:3.9') == DIGEST
+    assert docker.calls == [['image', 'inspect', '--format', '{{.Id}}', DIGEST]]
+
+
+def test_FUNCTION_resolve_WITH_cache_miss_EXPECT_looked_up_without_pull_and_pinned(build_root, monkeypatch):
+    """
+    Test whether an unknown image is looked up in the registry (not pulled), and its digest
+    is pinned in the cache and reused within the process.
+
+    :return: No return.
+    """
+    docker = FakeDocker(local_images=[], registry_digest=FRESH_DIGEST[len('python@'):])
+    monkeypatch.setattr(docker_image_resolver.subprocess, 'run', docker.run)
+
+    assert DockerImageResolver.resolve('python:3.9') == FRESH_DIGEST
+    assert DockerImageResolver.resolve('python:3.9') == FRESH_DIGEST
+    assert docker.pulls == []
+    assert docker.calls[-1] == ['buildx', 'imagetools', 'inspect', '--format', '{{json .Manifest}}', 'python:3.9']
+
+    cache = json.loads((build_root / '.docker_image_digests.json').read_text())
+    assert cache == {'python:3.9': FRESH_DIGEST}
+
+
+def test_FUNCTION_resolve_WITH_cached_digest_missing_locally_EXPECT_repinned(build_root, monkeypatch):
+    """
+    Test whether a cached digest that is no longer present locally is replaced with a fresh one.
+
+    :return: No return.
+    """
+    (build_root / '.docker_image_digests.json').write_text(json.dumps({'python:3.9': DIGEST}))
+
+    docker = FakeDocker(local_images=[], registry_digest=FRESH_DIGEST[len('python@'):])
+    monkeypatch.setattr(docker_image_resolver.subprocess, 'run', docker.run)
+
+    assert DockerImageResolver.resolve('python:3.9') == FRESH_DIGEST
+    assert docker.pulls == []
+
+
+def test_FUNCTION_resolve_WITH_docker_not_available_EXPECT_registry_http_api(build_root, monkeypatch):
+    """
+    Test whether a public image is resolved with the registry HTTP API and an anonymous
+    token if docker is not available, so that runners without docker get the same digests.
+
+    :return: No return.
+    """
+    def run(args, **kwargs):
+        raise FileNotFoundError('docker')
+
+    requests = []
+
+    def urlopen(request, timeout=None):
+        requests.append(request)
+
+        if isinstance(request, str):
+            assert request == 'https://auth.docker.io/token?service=registry.docker.io&scope=repository%3Alibrary%2Fpython%3Apull'
+            return io.BytesIO(json.dumps({'token': 'anonymous'}).encode())
+
+        assert request.full_url == 'https://registry-1.docker.io/v2/library/python/manifests/3.9'
+        assert request.get_method() == 'HEAD'
+
+        if not request.has_header('Authorization'):
+            challenge = 'Bearer realm="https://auth.docker.io/token",service="registry.docker.io",scope="repository:library/python:pull"'
+            raise HTTPError(request.full_url, 401, 'Unauthorized', {'WWW-Authenticate': challenge}, None)
+
+        assert request.get_header('Authorization') == 'Bearer anonymous'
+        response = io.BytesIO(b'')
+        response.headers = {'Docker-Content-Digest': FRESH_DIGEST[len('python@'):]}
+        return response
+
+    monkeypatch.setattr(docker_image_resolver.subprocess, 'run', run)
+    monkeypatch.setattr(docker_image_resolver, 'urlopen', urlopen)
+
+    assert DockerImageResolver.resolve('python:3.9') == FRESH_DIGEST
+    assert len(requests) == 3
+
+
+def test_FUNCTION_resolve_WITH_docker_and_registry_not_available_EXPECT_floating_tag(build_root, monkeypatch):
+    """
+    Test whether the image is used as is, if neither docker nor the registry is available.
+
+    :return: No return.
+    """
+    def run(args, **kwargs):
+        raise FileNotFoundError('docker')
+
+    monkeypatch.setattr(docker_image_resolver.subprocess, 'run', run)
+
+    assert DockerImageResolver.resolve('python:3.9') == 'python:3.9'
+    assert not (build_root / '.docker_image_digests.json').exists()
+
+
+def test_FUNCTION_resolve_WITH_digest_reference_EXPECT_unchanged(build_root, monkeypatch):
+    """
+    Test whether an already pinned image is not resolved again.
+
+    :return: No return.
+    """
+    docker = FakeDocker(local_images=[])
+    monkeypatch.setattr(docker_image_resolver.subprocess, 'run', docker.run)
+
+    assert DockerImageResolver.resolve(DIGEST) == DIGEST
+    assert docker.calls == []
+
+
+def test_FUNCTION_resolve_WITH_registry_port_EXPECT_same_repository_digest(build_root, monkeypatch):
+    """
+    Test whether a looked up digest is pinned to the requested repository (including a registry
+    with a port) and, if the registry is not reachable, whether among many digests of a local image
+    the one of the requested repository is pinned.
+
+    :return: No return.
+    """
+    other = 'python@sha256:' + 'c' * 64
+    own = 'localhost:5000/python@sha256:' + 'd' * 64
+
+    docker = FakeDocker(local_images=[], registry_digest='sha256:' + 'd' * 64)
+    monkeypatch.setattr(docker_image_resolver.subprocess, 'run', docker.run)
+
+    assert DockerImageResolver.resolve('localhost:5000/python:3.9') == own
+
+    docker = FakeDocker(local_images=['localhost:5000/python:3.10'], repo_digests=[other, own])
+    monkeypatch.setattr(docker_image_resolver.subprocess, 'run', docker.run)
+
+    assert DockerImageResolver.resolve('localhost:5000/python:3.10') == own
+    assert docker.pulls == []
+
+
+@pytest.mark.parametrize('image, repository', [
+    ('python:3.9', 'python'),
+    ('python', 'python'),
+    ('library/python:3.9-slim', 'library/python'),
+    ('localhost:5000/python:3.9', 'localhost:5000/python'),
+    ('localhost:5000/python', 'localhost:5000/python'),
+    ('registry.example.com:443/team/python:3.9', 'registry.example.com:443/team/python'),
+])
+def test_FUNCTION_repository_WITH_image_reference_EXPECT_tag_stripped(image, repository):
+    """
+    Test whether a tag is stripped from an image reference, while a registry port is kept.
+
+    :return: No return.
+    """
+    assert DockerImageResolver._DockerImageResolver__repository(image) == repository
+
+
+@pytest.mark.parametrize('image, reference', [
+    ('python:3.9', ('registry-1.docker.io', 'library/python', '3.9')),
+    ('python', ('registry-1.docker.io', 'library/python', 'latest')),
+    ('docker.io/python:3.9', ('registry-1.docker.io', 'library/python', '3.9')),
+    ('bitnami/python:3.9', ('registry-1.docker.io', 'bitnami/python', '3.9')),
+    ('localhost:5000/python:3.9', ('localhost:5000', 'python', '3.9')),
+    ('public.ecr.aws/lambda/python:3.9', ('public.ecr.aws', 'lambda/python', '3.9')),
+])
+def test_FUNCTION_reference_WITH_image_reference_EXPECT_registry_repository_and_tag(image, reference):
+    """
+    Test whether an image reference is split to a registry host, repository path and tag,
+    with Docker Hub defaults.
+
+    :return: No return.
+    """
+    assert DockerImageResolver._DockerImageResolver__reference(image) == reference
@@ -0,0 +1,83 @@
+import pytest
+from aws_cdk import App, Stack
+from aws_cdk.assertions import Template
+from aws_cdk.aws_lambda import Function, Runtime, Code
+
+from b_cfn_lambda_layer.lambda_layer import LambdaLayer
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+
+
+@pytest.fixture
+def prebuilt_layer(tmp_path, monkeypatch) -> None:
+    """
+    Gives every layer the same prebuilt empty asset, so that docker is not needed.
+    """
+    (tmp_path / 'python').mkdir()
+    monkeypatch.setattr(LambdaLayerCode, 'build_artifact', lambda self: str(tmp_path))
+
+
+def function(stack: Stack, name: str) -> Function:
+    return Function(
+        scope=stack,
+        id=name,
+        runtime=Runtime.PYTHON_3_9,
+        handler='index.handler',
+        code=Code.from_inline('def handler(event, context): pass')
+    )
+
+
+def test_RESOURCE_lambda_layer_WITH_default_ssm_parameter_EXPECT_parameter_created_eagerly(prebuilt_layer):
+    """
+    Test whether the layer's SSM parameter is created even if the layer is never shared,
+    same as before lazy SSM parameters existed.
+
+    :return: No return.
+    """
+    stack = Stack(App(), 'LayerStack')
+    LambdaLayer(scope=stack, name='MyLayer')
+
+    template = Template.from_stack(stack)
+    template.resource_count_is('AWS::SSM::Parameter', 1)
+    template.has_resource_properties('AWS::SSM::Parameter', {'Name': 'MyLayerArn'})
+
+
+def test_RESOURCE_lambda_layer_WITH_lazy_ssm_parameter_EXPECT_no_parameter(prebuilt_layer):
+    """
+    Test whether a lazy SSM parameter is not created if the layer is never shared.
+
+    :return: No return.
+    """
+    stack = Stack(App(), 'LayerStack')
+    LambdaLayer(scope=stack, name='MyLayer', lazy_ssm_parameter=True)
+
+    template = Template.from_stack(stack)
+    template.resource_count_is('AWS::Lambda::LayerVersion', 1)
+    template.resource_count_is('AWS::SSM::Parameter', 0)
+
+
+def test_RESOURCE_lambda_layer_WITH_lazy_ssm_parameter_and_cross_stack_functions_EXPECT_single_parameter(
+        prebuilt_layer
+):
+    """
+    Test whether sharing a lazy layer with functions of another stack creates exactly one
+    SSM parameter, which the functions' stack resolves instead of referencing the layer directly.
+
+    :return: No return.
+    """
+    app = App()
+    layer_stack = Stack(app, 'LayerStack')
+    function_stack = Stack(app, 'FunctionStack')
+
+    layer = LambdaLayer(scope=layer_stack, name='MyLayer', lazy_ssm_parameter=True)
+    layer.add_to_function(function(function_stack, 'FirstFunction'), function(function_stack, 'SecondFunction'))
+    layer.add_to_function(function(function_stack, 'ThirdFunction'))
+
+    layer_template = Template.from_stack(layer_stack)
+    layer_template.resource_count_is('AWS::SSM::Parameter', 1)
+    layer_template.has_resource_properties('AWS::SSM::Parameter', {'Name': 'MyLayerArn'})
+
+    function_template = Template.from_stack(function_stack)
+    function_template.resource_count_is('AWS::SSM::Parameter', 0)
+    function_template.resource_count_is('AWS::Lambda::Function', 3)
+    assert 'MyLayerArn' in str(function_template.find_parameters('*'))
+    assert function_stack.dependencies == [layer_stack]
@@ -0,0 +1,262 @@
+import json
+import os
+import shutil
+import subprocess
+
+from b_cfn_lambda_layer import docker_image_resolver
+from b_cfn_lambda_layer.artifact_store import ArtifactStore
+from b_cfn_lambda_layer.dependency import Dependency
+from b_cfn_lambda_layer.dependency_classifier import DependencyClassifier
+from b_cfn_lambda_layer.docker_build import DockerBuild
+from b_cfn_lambda_layer.host_build import HostBuild
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+from b_cfn_lambda_layer.package_version import PackageVersion
+
+
+class RecordingArtifactStore(ArtifactStore):
+    def __init__(self) -> None:
+        self.fetched = []
+        self.stored = []
+
+    def fetch(self, fingerprint: str, destination_path: str) -> bool:
+        self.fetched.append(fingerprint)
+        return False
+
+    def store(self, fingerprint: str, source_path: str) -> None:
+        self.stored.append(fingerprint)
+
+
+def fake_docker_build(builds: list):
+    """
+    Creates a replacement of DockerBuild.build that does what the Dockerfile does
+    with the source code: "COPY $INPUTS_PATH $OUTPUTS_PATH" copies the contents of
+    the inputs directory (not the directory itself) to the outputs directory.
+    """
+    def build(self, output_path: str, container_path: str = '/asset', on_output=None) -> None:
+        context_path = self._DockerBuild__context_path
+        build_args = self._DockerBuild__build_args
+        builds.append(build_args)
+
+        inputs_path = os.path.join(context_path, build_args['INPUTS_PATH'])
+        outputs_path = os.path.join(output_path, os.path.relpath(build_args['OUTPUTS_PATH'], container_path))
+        shutil.copytree(inputs_path, outputs_path)
+
+    return build
+
+
+def test_FUNCTION_build_artifact_WITH_source_code_EXPECT_parent_directory_kept(build_root, tmp_path, monkeypatch):
+    """
+    Test whether the source code lands in the layer under its parent directory,
+    so that it can be imported as "from layer_source.module import ...".
+
+    :return: No return.
+    """
+    source_path = tmp_path / 'layer_source'
+    source_path.mkdir()
+    (source_path / '__init__.py').write_text('')
+    (source_path / 'dummy_module.py').write_text('DUMMY = 1\n')
+
+    builds = []
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build(builds))
+
+    artifact_path = LambdaLayerCode(source_path=str(source_path), pin_docker_image=False).build_artifact()
+
+    assert len(builds) == 1
+    assert os.path.isfile(os.path.join(artifact_path, 'python', 'layer_source', 'dummy_module.py'))
+    assert not os.path.exists(os.path.join(artifact_path, 'python', 'dummy_module.py'))
+
+
+def test_FUNCTION_build_artifact_WITH_same_inputs_EXPECT_built_once(build_root, tmp_path, monkeypatch):
+    """
+    Test whether a layer with already built inputs is not built again.
+
+    :return: No return.
+    """
+    source_path = tmp_path / 'layer_source'
+    source_path.mkdir()
+    (source_path / 'dummy_module.py').write_text('DUMMY = 1\n')
+
+    builds = []
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build(builds))
+
+    first = LambdaLayerCode(source_path=str(source_path), pin_docker_image=False).build_artifact()
+    second = LambdaLayerCode(source_path=str(source_path), pin_docker_image=False).build_artifact()
+
+    assert first == second
+    assert len(builds) == 1
+
+    (source_path / 'dummy_module.py').write_text('DUMMY = 2\n')
+    third = LambdaLayerCode(source_path=str(source_path), pin_docker_image=False).build_artifact()
+
+    assert third != first
+    assert len(builds) == 2
+
+
+def test_FUNCTION_build_artifact_WITH_pinned_dependencies_EXPECT_artifact_store_used(build_root, monkeypatch):
+    """
+    Test whether layers with pinned dependencies are fetched from and stored in the artifact store.
+
+    :return: No return.
+    """
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build([]))
+    store = RecordingArtifactStore()
+
+    code = LambdaLayerCode(
+        dependencies=[Dependency('foo', PackageVersion.from_string_version('1.0'))],
+        pin_docker_image=False,
+        artifact_store=store
+    )
+    code.build_artifact()
+
+    assert store.fetched == [code.fingerprint()]
+    assert store.stored == [code.fingerprint()]
+
+
+def test_FUNCTION_build_artifact_WITH_artifact_store_hit_EXPECT_image_not_pulled(build_root, monkeypatch):
+    """
+    Test whether a layer restored from the artifact store (e.g. on an ephemeral CI runner with
+    an empty digest cache) resolves its pinned image without pulling it and is not built.
+
+    :return: No return.
+    """
+    docker_calls = []
+
+    def run(args, **kwargs):
+        docker_calls.append(args[1:])
+
+        if args[1:4] == ['buildx', 'imagetools', 'inspect']:
+            return subprocess.CompletedProcess(args, 0, stdout=json.dumps({'digest': 'sha256:' + 'a' * 64}), stderr='')
+
+        return subprocess.CompletedProcess(args, 1, stdout='', stderr='No such image')
+
+    monkeypatch.setattr(docker_image_resolver.subprocess, 'run', run)
+
+    builds = []
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build(builds))
+
+    class HitArtifactStore(RecordingArtifactStore):
+        def fetch(self, fingerprint: str, destination_path: str) -> bool:
+            self.fetched.append(fingerprint)
+            os.makedirs(os.path.join(destination_path, 'python'))
+            return True
+
+    store = HitArtifactStore()
+
+    code = LambdaLayerCode(
+        dependencies=[Dependency('foo', PackageVersion.from_string_version('1.0'))],
+        artifact_store=store
+    )
+    artifact_path = code.build_artifact()
+
+    assert code.build_docker_image() == 'python@sha256:' + 'a' * 64
+    assert store.fetched == [code.fingerprint()]
+    assert os.path.isdir(os.path.join(artifact_path, 'python'))
+    assert builds == []
+    assert not [call for call in docker_calls if call[0] == 'pull']
+
+
+def test_FUNCTION_build_artifact_WITH_unpinned_dependencies_EXPECT_artifact_store_skipped(build_root, monkeypatch):
+    """
+    Test whether layers with "latest" dependencies (whose fingerprint does not change when
+    a new version is released) are never fetched from or stored in the artifact store.
+
+    :return: No return.
+    """
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build([]))
+    store = RecordingArtifactStore()
+
+    LambdaLayerCode(
+        dependencies=[
+            Dependency('foo', PackageVersion.from_string_version('1.0')),
+            Dependency('bar', PackageVersion.latest())
+        ],
+        pin_docker_image=False,
+        artifact_store=store
+    ).build_artifact()
+
+    assert store.fetched == []
+    assert store.stored == []
+
+
+def test_FUNCTION_build_artifact_WITH_wheels_on_host_EXPECT_resolved_pins_installed_without_deps(
+        build_root,
+        tmp_path,
+        monkeypatch
+):
+    """
+    Test whether a split build installs exactly the resolved pins on both sides, with "--no-deps",
+    so that neither the host nor docker resolves dependencies on its own.
+
+    :return: No return.
+    """
+    pin = PackageVersion.from_string_version
+    wheels = [Dependency('python-jose', pin('3.3.0')), Dependency('six', pin('1.16.0'))]
+    sources = [Dependency('pycrypto', pin('2.6.1'))]
+
+    monkeypatch.setattr(DependencyClassifier, 'split', lambda self, dependencies: (wheels, sources))
+
+    host_installs = []
+
+    def install_dependencies(self, output_path: str) -> None:
+        host_installs.append([dependency.build_string() for dependency in self._HostBuild__dependencies])
+        os.makedirs(os.path.join(output_path, 'six-1.16.0.dist-info'))
+
+    monkeypatch.setattr(HostBuild, 'install_dependencies', install_dependencies)
+
+    builds = []
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build(builds))
+
+    (tmp_path / 'layer_source').mkdir()
+    (tmp_path / 'layer_source' / 'module.py').write_text('')
+
+    artifact_path = LambdaLayerCode(
+        source_path=str(tmp_path / 'layer_source'),
+        dependencies=[Dependency('python-jose', pin('3.3.0')), Dependency('pycrypto', pin('2.6.1'))],
+        docker_image='python:3.9',
+        pin_docker_image=False,
+        install_pure_python_on_host=True
+    ).build_artifact()
+
+    assert host_installs == [['python-jose==3.3.0', 'six==1.16.0']]
+    assert [build['PIP_INSTALL'] for build in builds] == ['pip install pycrypto==2.6.1 -t /asset/python --no-deps']
+    assert sorted(os.listdir(os.path.join(artifact_path, 'python'))) == ['layer_source', 'six-1.16.0.dist-info']
+
+
+def test_FUNCTION_build_artifact_WITH_sdist_only_dependency_EXPECT_only_it_built_in_docker(
+        build_root,
+        tmp_path,
+        monkeypatch
+):
+    """
+    Test whether only a dependency that resolves to a source distribution is built in docker,
+    while dependencies with target platform wheels (including compiled ones) are installed on the host.
+
+    :return: No return.
+    """
+    resolved = [
+        ('cryptography', '41.0.7', 'cryptography-41.0.7-cp37-abi3-manylinux2014_x86_64.whl'),
+        ('cffi', '1.16.0', 'cffi-1.16.0-cp39-cp39-manylinux_2_17_x86_64.manylinux2014_x86_64.whl'),
+        ('pycrypto', '2.6.1', 'pycrypto-2.6.1.tar.gz'),
+    ]
+    monkeypatch.setattr(DependencyClassifier, '_DependencyClassifier__resolve', lambda self, dependencies: resolved)
+
+    host_installs = []
+
+    def install_dependencies(self, output_path: str) -> None:
+        host_installs.append([dependency.build_string() for dependency in self._HostBuild__dependencies])
+        os.makedirs(output_path)
+
+    monkeypatch.setattr(HostBuild, 'install_dependencies', install_dependencies)
+
+    builds = []
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build(builds))
+
+    LambdaLayerCode(
+        dependencies=[Dependency('cryptography', PackageVersion.latest()), Dependency('pycrypto', PackageVersion.latest())],
+        docker_image='python:3.9',
+        pin_docker_image=False,
+        install_pure_python_on_host=True
+    ).build_artifact()
+
+    assert host_installs == [['cryptography==41.0.7', 'cffi==1.16.0']]
+    assert [build['PIP_INSTALL'] for build in builds] == ['pip install pycrypto==2.6.1 -t /asset/python --no-deps']
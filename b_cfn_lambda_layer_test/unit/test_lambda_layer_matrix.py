@@ -0,0 +1,123 @@
+import os
+
+from aws_cdk import App, Stack
+from aws_cdk.aws_lambda import Runtime
+
+from b_cfn_lambda_layer.docker_build import DockerBuild
+from b_cfn_lambda_layer.lambda_layer_matrix import LambdaLayerMatrix
+from b_cfn_lambda_layer.package_version import PackageVersion
+
+
+def fake_docker_build(compiled: bool):
+    """
+    Creates a replacement of DockerBuild.build that installs a distribution the way
+    pip does in a python docker image: RECORD lists files compiled by that python
+    version, although the Dockerfile deletes compiled files afterwards.
+
+    :param compiled: Whether the distribution ships a compiled extension module,
+        which differs for every python version.
+    """
+    def build(self, output_path: str, container_path: str = '/asset', on_output=None) -> None:
+        build_args = self._DockerBuild__build_args
+        tag = build_args['DOCKER_IMAGE'].split(':')[-1].replace('.', '')
+
+        python_path = os.path.join(output_path, os.path.relpath(build_args['OUTPUTS_PATH'], container_path))
+        dist_info_path = os.path.join(python_path, 'dummy-1.0.0.dist-info')
+        os.makedirs(dist_info_path)
+
+        files = ['dummy.py']
+        if compiled:
+            files.append(f'_dummy.cpython-{tag}-x86_64-linux-gnu.so')
+
+        for file_name in files:
+            with open(os.path.join(python_path, file_name), 'w') as file:
+                file.write('DUMMY = 1\n')
+
+        with open(os.path.join(dist_info_path, 'INSTALLER'), 'w') as file:
+            file.write('pip\n')
+
+        with open(os.path.join(dist_info_path, 'RECORD'), 'w') as file:
+            file.write(f'__pycache__/dummy.cpython-{tag}.pyc,,\n')
+            for file_name in files:
+                file.write(f'{file_name},sha256=dummy,10\n')
+            file.write('dummy-1.0.0.dist-info/INSTALLER,sha256=dummy,4\n')
+            file.write('dummy-1.0.0.dist-info/RECORD,,\n')
+
+    return build
+
+
+def test_RESOURCE_layer_matrix_WITH_pure_python_dependencies_EXPECT_single_layer(build_root, monkeypatch):
+    """
+    Test whether python versions whose builds differ only by installation metadata
+    (compiled files recorded by pip) share a single layer.
+
+    :return: No return.
+    """
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build(compiled=False))
+
+    matrix = LambdaLayerMatrix(
+        scope=Stack(App(), 'TestStack'),
+        name='MyLayer',
+        code_runtimes=[Runtime.PYTHON_3_9, Runtime.PYTHON_3_10],
+        dependencies={'dummy': PackageVersion.from_string_version('1.0.0')},
+        pin_docker_image=False
+    )
+
+    assert len(matrix.layers) == 1
+    assert matrix.layer_for(Runtime.PYTHON_3_9) is matrix.layer_for(Runtime.PYTHON_3_10)
+    assert matrix.layers[0].node.id == 'MyLayer'
+
+
+def test_RESOURCE_layer_matrix_WITH_compiled_dependencies_EXPECT_layer_per_version(build_root, monkeypatch):
+    """
+    Test whether python versions whose builds contain different compiled modules get separate
+    layers. The layer of the lowest python version keeps the given name (so that diverging payloads
+    do not replace it), other layers are named after their python versions.
+
+    :return: No return.
+    """
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build(compiled=True))
+
+    matrix = LambdaLayerMatrix(
+        scope=Stack(App(), 'TestStack'),
+        name='MyLayer',
+        code_runtimes=[Runtime.PYTHON_3_9, Runtime.PYTHON_3_10],
+        dependencies={'dummy': PackageVersion.from_string_version('1.0.0')},
+        pin_docker_image=False
+    )
+
+    assert len(matrix.layers) == 2
+    assert matrix.layer_for(Runtime.PYTHON_3_9).node.id == 'MyLayer'
+    assert matrix.layer_for(Runtime.PYTHON_3_10).node.id == 'MyLayerPy310'
+
+
+def test_RESOURCE_layer_matrix_WITH_repeated_synth_EXPECT_payload_hashed_once(build_root, monkeypatch):
+    """
+    Test whether payload hashes of already built artifacts are cached, so that
+    subsequent synths do not read every file of every artifact again.
+
+    :return: No return.
+    """
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build(compiled=True))
+
+    hashed = []
+    payload_hash = LambdaLayerMatrix._LambdaLayerMatrix__payload_hash
+
+    def counting_payload_hash(artifact_path: str) -> str:
+        hashed.append(artifact_path)
+        return payload_hash(artifact_path)
+
+    monkeypatch.setattr(LambdaLayerMatrix, '_LambdaLayerMatrix__payload_hash', staticmethod(counting_payload_hash))
+
+    for _ in range(2):
+        matrix = LambdaLayerMatrix(
+            scope=Stack(App(), 'TestStack'),
+            name='MyLayer',
+            code_runtimes=[Runtime.PYTHON_3_9, Runtime.PYTHON_3_10],
+            dependencies={'dummy': PackageVersion.from_string_version('1.0.0')},
+            pin_docker_image=False
+        )
+
+        assert len(matrix.layers) == 2
+
+    assert len(hashed) == 2
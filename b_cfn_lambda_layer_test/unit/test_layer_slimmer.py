@@ -0,0 +1,142 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from b_cfn_lambda_layer.layer_slimmer import LayerSlimmer
+
+
+def add_distribution(
+        python_path: Path,
+        name: str,
+        version: str,
+        files: Dict[str, str],
+        requires: Optional[List[str]] = None
+) -> None:
+    """
+    Installs a fake distribution the way pip does: files plus a dist-info directory
+    with METADATA (including Requires-Dist headers) and RECORD.
+    """
+    for path, content in files.items():
+        (python_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (python_path / path).write_text(content)
+
+    dist_info = f'{name.replace("-", "_")}-{version}.dist-info'
+    (python_path / dist_info).mkdir()
+
+    metadata = ['Metadata-Version: 2.1', f'Name: {name}', f'Version: {version}']
+    metadata += [f'Requires-Dist: {requirement}' for requirement in requires or []]
+    (python_path / dist_info / 'METADATA').write_text('\n'.join(metadata) + '\n\nLong description.\nRequires-Dist: ignored\n')
+
+    record = [f'{path},sha256=x,1' for path in files]
+    record += [f'{dist_info}/METADATA,,', f'{dist_info}/RECORD,,', '../../bin/script,,']
+    (python_path / dist_info / 'RECORD').write_text('\n'.join(record) + '\n')
+
+
+@pytest.fixture
+def layer_path(tmp_path) -> Path:
+    python_path = tmp_path / 'layer' / 'python'
+    python_path.mkdir(parents=True)
+
+    # "jose" requires "ecdsa" (through metadata only) and "cryptography" only for an extra.
+    add_distribution(
+        python_path, 'python-jose', '3.3.0',
+        {'jose/__init__.py': 'from jose import jwt\n', 'jose/jwt.py': 'import json\n'},
+        requires=['ecdsa (!=0.15)', 'rsa', 'cryptography (>=3.4.0) ; extra == "cryptography"']
+    )
+    add_distribution(python_path, 'ecdsa', '0.18.0', {'ecdsa/__init__.py': 'import six\n'})
+    add_distribution(python_path, 'rsa', '4.9', {'rsa/__init__.py': ''}, requires=['pyasn1>=0.1.3'])
+    add_distribution(python_path, 'pyasn1', '0.5.0', {'pyasn1/__init__.py': ''})
+    add_distribution(python_path, 'six', '1.16.0', {'six.py': ''})
+    add_distribution(python_path, 'cryptography', '41.0.7', {'cryptography/__init__.py': ''})
+    # A package imported only dynamically, by a literal name.
+    add_distribution(python_path, 'plugin', '1.0', {'plugin/__init__.py': ''})
+    add_distribution(python_path, 'boto3', '1.0', {'boto3/__init__.py': ''})
+    # Source code without a distribution.
+    (python_path / 'layer_source').mkdir()
+    (python_path / 'layer_source' / '__init__.py').write_text('import importlib\nimportlib.import_module("plugin.sub")\n')
+    (python_path / 'compiled.cpython-39-x86_64-linux-gnu.so').write_text('')
+
+    return tmp_path / 'layer'
+
+
+def handler(tmp_path: Path, code: str) -> str:
+    (tmp_path / 'handler').mkdir(exist_ok=True)
+    (tmp_path / 'handler' / 'index.py').write_text(code)
+    return str(tmp_path / 'handler')
+
+
+def test_FUNCTION_reachable_WITH_package_import_EXPECT_distribution_and_requirements(layer_path, tmp_path):
+    """
+    Test whether a whole distribution (with its dist-info), its imports and its
+    declared requirements (transitively, skipping extras) are kept.
+
+    :return: No return.
+    """
+    entries = LayerSlimmer(str(layer_path)).reachable(handler(tmp_path, 'from jose import jwt\n'))
+
+    assert entries == {
+        'jose', 'python_jose-3.3.0.dist-info',
+        # Required through metadata.
+        'ecdsa', 'ecdsa-0.18.0.dist-info',
+        'rsa', 'rsa-4.9.dist-info',
+        'pyasn1', 'pyasn1-0.5.0.dist-info',
+        # Imported by ecdsa.
+        'six.py', 'six-1.16.0.dist-info',
+    }
+
+
+def test_FUNCTION_reachable_WITH_import_module_literal_EXPECT_dynamic_import_kept(layer_path, tmp_path):
+    """
+    Test whether importlib.import_module calls with a literal name are followed.
+
+    :return: No return.
+    """
+    entries = LayerSlimmer(str(layer_path)).reachable(handler(tmp_path, 'import layer_source\n'))
+
+    assert entries == {'layer_source', 'plugin', 'plugin-1.0.dist-info'}
+
+
+def test_FUNCTION_reachable_WITH_extra_modules_EXPECT_kept(layer_path, tmp_path):
+    """
+    Test whether explicitly given modules are kept, including single-file extension modules.
+
+    :return: No return.
+    """
+    entries = LayerSlimmer(str(layer_path)).reachable(handler(tmp_path, 'import os\n'), extra_modules=['boto3', 'compiled'])
+
+    assert entries == {'boto3', 'boto3-1.0.dist-info', 'compiled.cpython-39-x86_64-linux-gnu.so'}
+
+
+def test_FUNCTION_reachable_WITH_unparsable_file_EXPECT_ignored(layer_path, tmp_path):
+    """
+    Test whether python files that can not be parsed do not break the analysis.
+
+    :return: No return.
+    """
+    (layer_path / 'python' / 'six.py').write_text('print "python 2"\n')
+
+    entries = LayerSlimmer(str(layer_path)).reachable(handler(tmp_path, 'import six\n'))
+
+    assert entries == {'six.py', 'six-1.16.0.dist-info'}
+
+
+def test_FUNCTION_slim_WITH_same_entries_EXPECT_shared_layer(layer_path, tmp_path):
+    """
+    Test whether a slimmed layer contains only given entries and is shared by equal entry sets.
+
+    :return: No return.
+    """
+    slimmer = LayerSlimmer(str(layer_path))
+    entries = slimmer.reachable(handler(tmp_path, 'import rsa\n'))
+
+    first = slimmer.slim(entries, str(tmp_path / 'slim'))
+    second = slimmer.slim(set(entries), str(tmp_path / 'slim'))
+    other = slimmer.slim(entries | {'six.py'}, str(tmp_path / 'slim'))
+
+    assert first == second
+    assert first != other
+    assert sorted(os.listdir(os.path.join(first, 'python'))) == sorted(entries)
+    assert os.path.isfile(os.path.join(first, 'python', 'rsa', '__init__.py'))
+    assert os.path.isfile(os.path.join(first, 'python', 'rsa-4.9.dist-info', 'RECORD'))
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from b_cfn_lambda_layer.layers_config import LayersConfig
+
+
+def test_FUNCTION_from_file_WITH_relative_source_paths_EXPECT_resolved_against_file(tmp_path):
+    """
+    Test whether relative source paths of layers and of defaults are resolved
+    against the layers file directory.
+
+    :return: No return.
+    """
+    (tmp_path / 'layers.yaml').write_text(
+        'defaults:\n'
+        '  source_path: ./default_source\n'
+        'layers:\n'
+        '  DefaultLayer: {}\n'
+        '  OwnLayer:\n'
+        '    source_path: ../own_source\n'
+    )
+
+    codes = LayersConfig.from_file(str(tmp_path / 'layers.yaml')).codes()
+
+    assert codes['DefaultLayer'].source_path == os.path.join(str(tmp_path), './default_source')
+    assert codes['OwnLayer'].source_path == os.path.join(str(tmp_path), '../own_source')
+
+
+def test_FUNCTION_from_file_WITH_string_versions_EXPECT_versions_kept(tmp_path):
+    """
+    Test whether quoted versions are kept as they are.
+
+    :return: No return.
+    """
+    (tmp_path / 'layers.yaml').write_text(
+        'layers:\n'
+        '  Layer:\n'
+        '    dependencies:\n'
+        '      foo: "1.10"\n'
+        '      bar: latest\n'
+        '      baz: false\n'
+    )
+
+    code = LayersConfig.from_file(str(tmp_path / 'layers.yaml')).codes()['Layer']
+
+    assert [dependency.build_string() for dependency in code.dependencies] == ['foo==1.10', 'bar', '']
+
+
+def test_FUNCTION_from_file_WITH_numeric_version_EXPECT_error(tmp_path):
+    """
+    Test whether unquoted numeric versions (that lose their meaning, e.g. 1.10 -> 1.1) are rejected.
+
+    :return: No return.
+    """
+    (tmp_path / 'layers.yaml').write_text(
+        'layers:\n'
+        '  Layer:\n'
+        '    dependencies:\n'
+        '      foo: 1.10\n'
+    )
+
+    with pytest.raises(ValueError, match='must be a string'):
+        LayersConfig.from_file(str(tmp_path / 'layers.yaml'))
+
+
+def test_FUNCTION_from_file_WITH_toml_file_EXPECT_same_structure(tmp_path):
+    """
+    Test whether TOML layers files are supported.
+
+    :return: No return.
+    """
+    (tmp_path / 'layers.toml').write_text(
+        '[defaults]\n'
+        'docker_image = "python:3.10"\n'
+        '[layers.Layer.dependencies]\n'
+        'foo = "2.0"\n'
+    )
+
+    code = LayersConfig.from_file(str(tmp_path / 'layers.toml')).codes()['Layer']
+
+    assert code.docker_image == 'python:3.10'
+    assert [dependency.build_string() for dependency in code.dependencies] == ['foo==2.0']
+
+
+def test_FUNCTION_init_WITH_unsupported_key_EXPECT_error():
+    """
+    Test whether unsupported layer parameters are rejected.
+
+    :return: No return.
+    """
+    with pytest.raises(ValueError, match='unsupported keys'):
+        LayersConfig(layers={'Layer': {'source': './source'}})
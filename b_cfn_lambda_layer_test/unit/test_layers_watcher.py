@@ -0,0 +1,58 @@
+import os
+
+from b_cfn_lambda_layer.docker_build import DockerBuild
+from b_cfn_lambda_layer.lambda_layer_code import LambdaLayerCode
+from b_cfn_lambda_layer.layers_watcher import LayersWatcher
+from b_cfn_lambda_layer_test.unit.test_lambda_layer_code import fake_docker_build
+
+
+def test_FUNCTION_poll_WITH_changed_source_EXPECT_only_changed_layer(build_root, tmp_path):
+    """
+    Test whether only layers with changed source files are reported as changed.
+
+    :return: No return.
+    """
+    for name in ('first', 'second'):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'module.py').write_text('VALUE = 1\n')
+
+    codes = {
+        name: LambdaLayerCode(source_path=str(tmp_path / name), pin_docker_image=False, name=name)
+        for name in ('first', 'second')
+    }
+    watcher = LayersWatcher(codes=codes)
+
+    assert watcher.poll() == {}
+
+    (tmp_path / 'second' / 'module.py').write_text('VALUE = 22\n')
+    assert watcher.poll() == {'second': codes['second']}
+    assert watcher.poll() == {}
+
+    (tmp_path / 'first' / 'new.py').write_text('')
+    assert watcher.poll() == {'first': codes['first']}
+
+
+def test_FUNCTION_rebuild_WITH_changed_source_EXPECT_synth_finds_new_build(build_root, tmp_path, monkeypatch):
+    """
+    Test whether a rebuilt layer is published exactly where a synth (a fresh code object) looks for it.
+
+    :return: No return.
+    """
+    builds = []
+    monkeypatch.setattr(DockerBuild, 'build', fake_docker_build(builds))
+
+    (tmp_path / 'source').mkdir()
+    (tmp_path / 'source' / 'module.py').write_text('VALUE = 1\n')
+
+    code = LambdaLayerCode(source_path=str(tmp_path / 'source'), pin_docker_image=False, name='Layer')
+    watcher = LayersWatcher(codes={'Layer': code})
+
+    (tmp_path / 'source' / 'module.py').write_text('VALUE = 2\n')
+    for name, changed in watcher.poll().items():
+        watcher._LayersWatcher__rebuild(name, changed)
+
+    synth_code = LambdaLayerCode(source_path=str(tmp_path / 'source'), pin_docker_image=False, name='Layer')
+    assert os.path.isdir(f'{LambdaLayerCode.ARTIFACTS_ROOT}/{synth_code.fingerprint()}')
+
+    synth_code.build_artifact()
+    assert len(builds) == 1
@@ -0,0 +1,100 @@
+import io
+import tarfile
+
+import pytest
+
+boto3 = pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+
+from b_cfn_lambda_layer.artifact_store import ArtifactStore
+from b_cfn_lambda_layer.s3_artifact_store import S3ArtifactStore
+
+BUCKET = 'layer-artifacts'
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    monkeypatch.delenv('AWS_ENDPOINT_URL_S3', raising=False)
+
+    with moto.mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def test_RESOURCE_s3_artifact_store_WITH_stored_layer_EXPECT_restored(s3_client, tmp_path):
+    """
+    Test whether a layer stored in S3 is restored with the same contents.
+
+    :return: No return.
+    """
+    (tmp_path / 'source' / 'python').mkdir(parents=True)
+    (tmp_path / 'source' / 'python' / 'module.py').write_text('VALUE = 1\n')
+
+    store = S3ArtifactStore(bucket=BUCKET, prefix='layers', client=s3_client)
+    store.store('abc', str(tmp_path / 'source'))
+
+    assert store.fetch('abc', str(tmp_path / 'destination')) is True
+    assert (tmp_path / 'destination' / 'python' / 'module.py').read_text() == 'VALUE = 1\n'
+
+
+@pytest.mark.parametrize('uri, key', [
+    ('s3://layer-artifacts', 'abc.tar.gz'),
+    ('s3://layer-artifacts/', 'abc.tar.gz'),
+    ('s3://layer-artifacts/layers', 'layers/abc.tar.gz'),
+    ('s3://layer-artifacts/layers/', 'layers/abc.tar.gz'),
+    ('s3://layer-artifacts/ci/layers', 'ci/layers/abc.tar.gz'),
+])
+def test_FUNCTION_from_uri_WITH_prefix_EXPECT_prefix_joined_with_slash(s3_client, tmp_path, uri, key):
+    """
+    Test whether archive keys are "<prefix>/<fingerprint>.tar.gz" regardless of a trailing slash.
+
+    :return: No return.
+    """
+    (tmp_path / 'source' / 'python').mkdir(parents=True)
+
+    store = ArtifactStore.from_uri(uri)
+    assert isinstance(store, S3ArtifactStore)
+
+    store.store('abc', str(tmp_path / 'source'))
+
+    keys = [item['Key'] for item in s3_client.list_objects_v2(Bucket=BUCKET)['Contents']]
+    assert keys == [key]
+
+
+def test_RESOURCE_s3_artifact_store_WITH_missing_layer_EXPECT_not_restored(s3_client, tmp_path):
+    """
+    Test whether a missing archive (NoSuchKey) results in a cache miss rather than an error.
+
+    :return: No return.
+    """
+    store = S3ArtifactStore(bucket=BUCKET, prefix='layers', client=s3_client)
+
+    assert store.fetch('missing', str(tmp_path / 'destination')) is False
+    assert not (tmp_path / 'destination').exists()
+
+
+def test_RESOURCE_s3_artifact_store_WITH_path_traversal_member_EXPECT_error(s3_client, tmp_path):
+    """
+    Test whether a malicious archive in the bucket can not write outside of the destination.
+
+    :return: No return.
+    """
+    member = tarfile.TarInfo('../../escaped.py')
+    member.size = 1
+
+    fileobj = io.BytesIO()
+    with tarfile.open(fileobj=fileobj, mode='w:gz') as tar:
+        tar.addfile(member, io.BytesIO(b'x'))
+
+    s3_client.put_object(Bucket=BUCKET, Key='layers/evil.tar.gz', Body=fileobj.getvalue())
+
+    store = S3ArtifactStore(bucket=BUCKET, prefix='layers', client=s3_client)
+
+    with pytest.raises(ValueError, match='outside of the destination'):
+        store.fetch('evil', str(tmp_path / 'a' / 'b' / 'destination'))
+
+    assert not (tmp_path / 'a' / 'escaped.py').exists()
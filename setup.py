@@ -30,6 +30,11 @@ setup(
         'aws-cdk-lib>=2.0.0,<3.0.0',
         'aws-cdk-constructs>=2.0.0,<3.0.0',
     ],
+    extras_require={
+        'yaml': ['PyYAML>=5.0.0'],
+        'toml': ['tomli>=1.1.0; python_version < "3.11"'],
+        's3': ['boto3>=1.16.0,<2.0.0'],
+    },
     author='Laimonas Sutkus',
     author_email='laimonas.sutkus@biomapas.com',
     keywords='AWS CDK Lambda Layer',